@@ -1,15 +1,29 @@
 
 import os
+import sys
 import re
 import fitz
-import pandas as pd
 import time
+# Sdílené moduly (stability, timing, sections) jsou v Pojistovny/ – jediná kopie pro obě nasazení
+SHARED_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "Pojistovny")
+if SHARED_FOLDER not in sys.path:
+    sys.path.append(SHARED_FOLDER)
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from excel_evidence import ExcelJournalSink
+import stability
+from workers import WorkQueue, pending_pdfs
+from sections import koop_kryti
 
 WATCH_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\MAJETEK\AUTA"
 SORTED_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\SORTING"
+# PDF, která nejdou přečíst nebo zpracovat – jinak by spadla při každém spuštění znovu
+ERROR_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\CHYBY"
 EXCEL_PATH = r"C:\Users\kubab\OneDrive\Plocha\GFS\EVIDENCE\ÚDAJE AUTA.xlsx"
+# Worker vlákna pro zpracování PDF (observer jen zařazuje do fronty)
+EXTRACTION_WORKERS = 2
+# Délka fronty (0 = neomezená – skript nemá pravidelný průchod složkou, který by odmítnuté PDF zařadil)
+QUEUE_SIZE = 0
 
 def extract_common_fields():
     return {
@@ -24,6 +38,7 @@ def extract_common_fields():
     }
 
 COLUMNS = list(extract_common_fields().keys())
+EVIDENCE = ExcelJournalSink(EXCEL_PATH, COLUMNS)
 
 def extract_data_allianz(text):
     lines = text.splitlines()
@@ -180,23 +195,53 @@ def extract_data_koop(text):
         rok += 1900 if rok >= 50 else 2000
         data["Datum narození"] = f"{rc[4:6]}.{rc[2:4]}.{rok}"
 
-    kryti = re.search(r"Limit.*?na zdraví.*?(\d+\s*mil\.\s*Kč).*?škodě.*?(\d+\s*mil\.\s*Kč)", text, re.DOTALL)
+    # Jen v úseku za "Limit" s časovým rozpočtem (sections.py), ne .*? přes celý text
+    kryti = koop_kryti(text)
     if kryti:
-        data["Krytí PR"] = f"{kryti[1].replace(' ', '')}/{kryti[2].replace(' ', '')}"
+        data["Krytí PR"] = kryti
 
     return data
 
-class PDFHandler(FileSystemEventHandler):
-    def on_created(self, event):
-        if event.is_directory or not event.src_path.lower().endswith(".pdf"):
-            return
-
-        filename = os.path.basename(event.src_path)
-        print(f"📥 Nový PDF soubor detekován: {filename}")
-
-        doc = fitz.open(event.src_path)
-        text = "".join([page.get_text() for page in doc])
-        doc.close()
+def nacti_text(path):
+    doc = fitz.open(path)
+    text = "".join([page.get_text() for page in doc])
+    doc.close()
+    return text
+
+# Soubory, které se ještě dopisují: cesta -> kdy jsme je poprvé viděli (time.monotonic)
+WAITING = {}
+# Počet neúspěšných pokusů o soubor s přechodnou chybou (zamčený, přepsaný během čtení)
+RETRIES = stability.Retries()
+
+def zpracuj(path):
+    # Běží ve worker vlákně (workers.WorkQueue). Nedopsaný soubor a soubor s přechodnou
+    # chybou vrátí dobu, po které ho fronta zařadí znovu – worker mezitím nečeká.
+    # Chyba jednoho PDF neshodí worker – soubor jde do ERROR_FOLDER.
+    filename = os.path.basename(path)
+    stable = stability.is_stable(path)
+    if stable is None:
+        # Další událost pro už zpracovaný soubor (nebo soubor zmizel)
+        WAITING.pop(path, None)
+        return None
+    if not stable:
+        first_seen = WAITING.setdefault(path, time.monotonic())
+        if time.monotonic() - first_seen < stability.STABLE_TIMEOUT:
+            return stability.STABLE_INTERVAL
+        del WAITING[path]
+        print(f"⚠️ Soubor se nedopsal – přeskočeno: {filename}")
+        return None
+    WAITING.pop(path, None)
+
+    before = stability.signature(path)
+    try:
+        try:
+            text = nacti_text(path)
+        except Exception as e:
+            delay = RETRIES.delay(path, e, before)
+            if delay is not None:
+                return delay
+            raise
+        RETRIES.done(path)
 
         if re.search(r"allianz", text, re.IGNORECASE):
             print("✅ Allianz rozpoznán – spouštím extrakci...")
@@ -212,27 +257,62 @@ class PDFHandler(FileSystemEventHandler):
         for k, v in data.items():
             print(f"{k}: {v}")
 
-        df_new = pd.DataFrame([[data.get(col, "") for col in COLUMNS]], columns=COLUMNS)
+        EVIDENCE.append(data)
+        os.rename(path, os.path.join(SORTED_FOLDER, filename))
+        print("✅ Data zapsána a soubor přesunut.")
+    except Exception as e:
+        print(f"❌ Chyba při zpracování {filename}: {e}")
+        try:
+            os.rename(path, os.path.join(ERROR_FOLDER, filename))
+            print(f"📁 Soubor přesunut do {ERROR_FOLDER}.")
+        except OSError as chyba_presunu:
+            print(f"⚠️ Soubor se nepodařilo přesunout: {chyba_presunu}")
 
-        if os.path.exists(EXCEL_PATH):
-            df_old = pd.read_excel(EXCEL_PATH)
-            df_full = pd.concat([df_old, df_new], ignore_index=True)
-        else:
-            df_full = df_new
+class PDFHandler(FileSystemEventHandler):
+    # Observer jen zařadí PDF do fronty; stejný soubor ohlášený víc událostmi
+    # (nebo i doháněním složky při startu) fronta zařadí jen jednou
+    def __init__(self, work_queue):
+        self.work_queue = work_queue
 
-        df_full.to_excel(EXCEL_PATH, index=False)
-        os.rename(event.src_path, os.path.join(SORTED_FOLDER, filename))
-        print("✅ Data zapsána a soubor přesunut.")
+    def submit(self, path):
+        if not path.lower().endswith(".pdf"):
+            return
+        if self.work_queue.submit(path):
+            print(f"📥 Nový PDF soubor detekován: {os.path.basename(path)}")
+
+    def on_created(self, event):
+        if not event.is_directory:
+            self.submit(event.src_path)
+
+    def on_moved(self, event):
+        # Přejmenování v rámci složky (OneDrive i prohlížeče zapisují pod dočasným jménem)
+        if not event.is_directory and os.path.dirname(event.dest_path) == os.path.dirname(event.src_path):
+            self.submit(event.dest_path)
+
+    def on_closed(self, event):
+        # Zavření zapsaného souboru (hlásí jen některé platformy)
+        if not event.is_directory:
+            self.submit(event.src_path)
 
 if __name__ == "__main__":
     print("👀 Sleduji složku pro nové PDF soubory (Allianz + Kooperativa)...")
-    event_handler = PDFHandler()
+    os.makedirs(SORTED_FOLDER, exist_ok=True)
+    os.makedirs(ERROR_FOLDER, exist_ok=True)
+    work_queue = WorkQueue(zpracuj, workers=EXTRACTION_WORKERS, maxsize=QUEUE_SIZE)
+    work_queue.start()
+    event_handler = PDFHandler(work_queue)
     observer = Observer()
     observer.schedule(event_handler, WATCH_FOLDER, recursive=False)
     observer.start()
+    # PDF, která přibyla, když skript neběžel – stejnou cestou jako živé události
+    for path in pending_pdfs(WATCH_FOLDER):
+        event_handler.submit(path)
     try:
         while True:
             time.sleep(1)
+            EVIDENCE.flush_if_due()
     except KeyboardInterrupt:
         observer.stop()
     observer.join()
+    work_queue.stop()
+    EVIDENCE.close()
@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+import pandas as pd
+
+# Evidence v Excelu ("ÚDAJE AUTA.xlsx") bez načítání sešitu u každého PDF.
+# Řádky se nejdřív trvale zapíšou do SQLite deníku vedle sešitu a XLSX se
+# z deníku přegeneruje až po dávce řádků, po uplynutí max_delay nebo ručně (flush).
+#
+# Ruční úpravy sešitu se neztratí: deník si pamatuje čas změny sešitu po svém posledním zápisu
+# a když ho mezitím někdo v Excelu upravil (jiný čas změny), převezme před dalším zápisem
+# jeho obsah znovu (včetně přidaných sloupců) a nové řádky přidá za něj.
+# Zamčený sešit (otevřený v Excelu) se zkouší znovu s rostoucím odstupem.
+
+# První opakování zápisu do zamčeného sešitu (s) a nejdelší odstup mezi pokusy
+RETRY_DELAY = 5
+MAX_RETRY_DELAY = 300
+
+
+class ExcelJournalSink:
+    def __init__(self, excel_path, columns, journal_path=None, batch_size=50, max_delay=60):
+        self.excel_path = excel_path
+        self.columns = list(columns)
+        self.journal_path = journal_path or os.path.splitext(excel_path)[0] + ".journal.sqlite"
+        self.batch_size = batch_size
+        self.max_delay = max_delay
+        self._first_pending = None
+        self._next_attempt = 0.0
+        self._retry_delay = 0
+        self._lock = threading.RLock()
+
+        self.conn = sqlite3.connect(self.journal_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS radky (id INTEGER PRIMARY KEY AUTOINCREMENT, data TEXT NOT NULL)")
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (klic TEXT PRIMARY KEY, hodnota TEXT)")
+        self.conn.commit()
+        self._sync_workbook()
+        if self.pending():
+            self._first_pending = time.monotonic()
+
+    def _meta(self, klic, default=None):
+        row = self.conn.execute("SELECT hodnota FROM meta WHERE klic = ?", (klic,)).fetchone()
+        return row[0] if row else default
+
+    def _set_meta(self, klic, hodnota):
+        self.conn.execute("INSERT OR REPLACE INTO meta (klic, hodnota) VALUES (?, ?)", (klic, str(hodnota)))
+
+    def _workbook_mtime(self):
+        try:
+            return str(os.stat(self.excel_path).st_mtime_ns)
+        except FileNotFoundError:
+            return None
+
+    def _sync_workbook(self):
+        # Sešit změněný mimo deník (první spuštění nebo ruční úprava) převezme jako nový základ.
+        # Hodnoty se čtou v původních typech (čísla zůstanou čísly), nezapsané řádky deníku
+        # se přesunou za převzaté řádky.
+        mtime = self._workbook_mtime()
+        if mtime is None or mtime == self._meta("sesit_mtime"):
+            return
+
+        print(f"📒 Převádím {os.path.basename(self.excel_path)} do deníku (změněn mimo deník)...")
+        df_old = pd.read_excel(self.excel_path).astype(object)
+        df_old = df_old.where(df_old.notna(), "")
+        rows = []
+        for rec in df_old.to_dict("records"):
+            data = {col: "" for col in self.columns}
+            data.update(rec)
+            rows.append((json.dumps(data, ensure_ascii=False, default=str),))
+
+        done = int(self._meta("materializovano_do", 0))
+        with self.conn:
+            waiting = self.conn.execute("SELECT data FROM radky WHERE id > ? ORDER BY id", (done,)).fetchall()
+            self.conn.execute("DELETE FROM radky")
+            self.conn.executemany("INSERT INTO radky (data) VALUES (?)", rows)
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM radky").fetchone()[0]
+            self.conn.executemany("INSERT INTO radky (data) VALUES (?)", waiting)
+            self._set_meta("materializovano_do", last_id)
+            self._set_meta("sesit_mtime", mtime)
+
+    def pending(self):
+        done = int(self._meta("materializovano_do", 0))
+        return self.conn.execute("SELECT COUNT(*) FROM radky WHERE id > ?", (done,)).fetchone()[0]
+
+    def append(self, row):
+        data = json.dumps({col: row.get(col, "") for col in self.columns}, ensure_ascii=False)
+        with self._lock:
+            with self.conn:
+                self.conn.execute("INSERT INTO radky (data) VALUES (?)", (data,))
+            if self._first_pending is None:
+                self._first_pending = time.monotonic()
+
+            if self.pending() >= self.batch_size and time.monotonic() >= self._next_attempt:
+                self._flush()
+
+    def flush_if_due(self):
+        with self._lock:
+            now = time.monotonic()
+            if (self._first_pending is not None and now - self._first_pending >= self.max_delay
+                    and now >= self._next_attempt):
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            return self._flush()
+
+    def _locked(self):
+        # Na Windows je sešit otevřený v Excelu zamčený – to se pozná bez generování celého XLSX
+        try:
+            with open(self.excel_path, "r+b"):
+                return False
+        except FileNotFoundError:
+            return False
+        except PermissionError:
+            return True
+
+    def _postpone(self):
+        # Řádky zůstanou v deníku, další pokus až po odstupu (5 s, 10 s, 20 s … nejvýš MAX_RETRY_DELAY)
+        self._retry_delay = min(self._retry_delay * 2 or RETRY_DELAY, MAX_RETRY_DELAY)
+        self._next_attempt = time.monotonic() + self._retry_delay
+        print(f"⚠️ {os.path.basename(self.excel_path)} je otevřený, další pokus za {self._retry_delay} s.")
+        return False
+
+    def _flush(self):
+        if not self.pending():
+            self._first_pending = None
+            return True
+        if self._locked():
+            return self._postpone()
+        self._sync_workbook()
+
+        rows = [json.loads(data) for _, data in self.conn.execute("SELECT id, data FROM radky ORDER BY id")]
+        # Sloupce přidané ručně v Excelu zůstanou za sloupci evidence
+        columns = list(self.columns)
+        for row in rows:
+            columns.extend(col for col in row if col not in columns)
+        df = pd.DataFrame(rows, columns=columns)
+
+        # Zápis přes dočasný soubor – rozbitý sešit nevznikne ani při pádu
+        tmp_path = self.excel_path + ".tmp.xlsx"
+        df.to_excel(tmp_path, index=False)
+        try:
+            os.replace(tmp_path, self.excel_path)
+        except PermissionError:
+            os.remove(tmp_path)
+            return self._postpone()
+
+        with self.conn:
+            last_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM radky").fetchone()[0]
+            self._set_meta("materializovano_do", last_id)
+            self._set_meta("sesit_mtime", self._workbook_mtime())
+        self._first_pending = None
+        self._retry_delay = 0
+        self._next_attempt = 0.0
+        print(f"📊 Excel aktualizován ({len(rows)} řádků).")
+        return True
+
+    def close(self):
+        self.flush()
+        self.conn.close()
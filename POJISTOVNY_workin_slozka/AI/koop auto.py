@@ -1,14 +1,28 @@
 
 import os
+import sys
 import time
 import shutil
 import fitz  # PyMuPDF
-import pandas as pd
 import re
+import queue
+# Sdílené moduly (stability, timing, sections) jsou v Pojistovny/ – jediná kopie pro obě nasazení
+SHARED_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, os.pardir, "Pojistovny")
+if SHARED_FOLDER not in sys.path:
+    sys.path.append(SHARED_FOLDER)
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+from excel_evidence import ExcelJournalSink
+import stability
+from sections import koop_kryti
 
 WATCH_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\MAJETEK\AUTA"
 EXCEL_PATH = r"C:\Users\kubab\OneDrive\Plocha\GFS\EVIDENCE\ÚDAJE AUTA.xlsx"
 SORTED_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\SORTING"
+# PDF, která nejdou přečíst nebo zpracovat – jinak by je kontrola složky zařazovala pořád dokola
+ERROR_FOLDER = r"C:\Users\kubab\OneDrive\Plocha\GFS\CHYBY"
+# Jak často (s) projít složku pro jistotu i bez událostí watchdogu (0 = nikdy)
+RECONCILE_INTERVAL = 300
 
 def extract_data(text):
     def find(pattern, group=1, default=""):
@@ -84,9 +98,10 @@ def extract_data(text):
         "Vlastník - Plátce DPH": find_block(r"Plátce DPH"),
     }
 
-    kryti = re.search(r"Limit.*?na zdraví.*?(\d+\s*mil\.\s*Kč).*?škodě.*?(\d+\s*mil\.\s*Kč)", text, re.DOTALL)
+    # Jen v úseku za "Limit" s časovým rozpočtem (sections.py), ne .*? přes celý text
+    kryti = koop_kryti(text)
     if kryti:
-        data["Krytí PR"] = f"{kryti[1].replace(' ', '')}/{kryti[2].replace(' ', '')}"
+        data["Krytí PR"] = kryti
 
     rc = data["Rodné číslo"]
     if re.match(r"\d{6}", rc):
@@ -96,6 +111,10 @@ def extract_data(text):
 
     return data
 
+# Sloupce evidence = klíče, které vrací extract_data
+COLUMNS = list(extract_data("").keys())
+EVIDENCE = ExcelJournalSink(EXCEL_PATH, COLUMNS)
+
 def process_pdf(file_path):
     doc = fitz.open(file_path)
     full_text = ""
@@ -104,31 +123,85 @@ def process_pdf(file_path):
     doc.close()
     return extract_data(full_text)
 
+def zpracuj_soubor(full_path):
+    filename = os.path.basename(full_path)
+    if not stability.wait_until_stable(full_path):
+        print(f"Soubor se nedopsal nebo zmizel – přeskočeno: {filename}")
+        return
+    try:
+        data = stability.with_retry(process_pdf, full_path)
+        EVIDENCE.append(data)
+        shutil.move(full_path, os.path.join(SORTED_FOLDER, filename))
+        print(f"Zpracováno a přesunuto: {filename}")
+    except Exception as e:
+        print(f"Chyba při zpracování {filename}: {e}")
+        try:
+            shutil.move(full_path, os.path.join(ERROR_FOLDER, filename))
+            print(f"Soubor přesunut do {ERROR_FOLDER}.")
+        except OSError as chyba_presunu:
+            print(f"Soubor se nepodařilo přesunout: {chyba_presunu}")
+
+def je_pdf(path):
+    return path.lower().endswith(".pdf")
+
+class PDFHandler(FileSystemEventHandler):
+    # Observer jen zařadí cestu do fronty, zpracování běží v hlavním vlákně
+    def __init__(self, fronta):
+        self.fronta = fronta
+
+    def on_created(self, event):
+        if not event.is_directory and je_pdf(event.src_path):
+            self.fronta.put(event.src_path)
+
+    def on_moved(self, event):
+        # Soubor přejmenovaný v rámci složky (např. dokončené stahování)
+        if (not event.is_directory and je_pdf(event.dest_path)
+                and os.path.dirname(event.dest_path) == os.path.dirname(event.src_path)):
+            self.fronta.put(event.dest_path)
+
+    def on_closed(self, event):
+        # Zavření zapsaného souboru (hlásí jen některé platformy)
+        if not event.is_directory and je_pdf(event.src_path):
+            self.fronta.put(event.src_path)
+
+def kontrola_slozky(fronta):
+    # Záchranný průchod složkou – soubory, o kterých watchdog nedal vědět,
+    # a soubory, které se při minulém pokusu nedopsaly (chybné jsou v ERROR_FOLDER)
+    with os.scandir(WATCH_FOLDER) as entries:
+        for entry in entries:
+            if entry.is_file() and je_pdf(entry.name):
+                fronta.put(entry.path)
+
 def main():
     print("Sledování složky spuštěno...")
-    while True:
-        files = [f for f in os.listdir(WATCH_FOLDER) if f.lower().endswith(".pdf")]
-        if not files:
-            time.sleep(5)
-            continue
-
-        for filename in files:
-            full_path = os.path.join(WATCH_FOLDER, filename)
+    os.makedirs(ERROR_FOLDER, exist_ok=True)
+    fronta = queue.Queue()
+    observer = Observer()
+    observer.schedule(PDFHandler(fronta), WATCH_FOLDER, recursive=False)
+    observer.start()
+
+    # Soubory, které ve složce leží už před spuštěním
+    kontrola_slozky(fronta)
+    posledni_kontrola = time.monotonic()
+    try:
+        while True:
             try:
-                data = process_pdf(full_path)
-                df_new = pd.DataFrame([data])
-                if os.path.exists(EXCEL_PATH):
-                    df_old = pd.read_excel(EXCEL_PATH)
-                    df_full = pd.concat([df_old, df_new], ignore_index=True)
-                else:
-                    df_full = df_new
-                df_full.to_excel(EXCEL_PATH, index=False)
-                shutil.move(full_path, os.path.join(SORTED_FOLDER, filename))
-                print(f"Zpracováno a přesunuto: {filename}")
-            except Exception as e:
-                print(f"Chyba při zpracování {filename}: {e}")
-
-        time.sleep(5)
+                full_path = fronta.get(timeout=1)
+            except queue.Empty:
+                EVIDENCE.flush_if_due()
+                if RECONCILE_INTERVAL and time.monotonic() - posledni_kontrola >= RECONCILE_INTERVAL:
+                    kontrola_slozky(fronta)
+                    posledni_kontrola = time.monotonic()
+                continue
+            # Stejný soubor může přijít z události i z kontroly složky – zpracovaný už ve složce není
+            if os.path.exists(full_path):
+                zpracuj_soubor(full_path)
+    finally:
+        observer.stop()
+        observer.join()
 
 if __name__ == "__main__":
-    main()
+    try:
+        main()
+    except KeyboardInterrupt:
+        EVIDENCE.close()
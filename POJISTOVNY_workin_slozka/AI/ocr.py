@@ -0,0 +1,97 @@
+import io
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+# timing je v Pojistovny/ – cestu přidává skript, který ocr importuje
+from timing import StageTimer
+
+# OCR naskenovaných PDF po stránkách.
+# Stránky se rastrují postupně přes PyMuPDF (bez popplera a bez držení všech obrázků v RAM)
+# a tesseract je zpracovává paralelně v procesech. Najednou je rozpracováno nejvýš
+# max_in_flight stránek, takže paměť nestoupá s počtem stran.
+
+TESSERACT_CMD = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+OCR_DPI = 300
+OCR_LANG = "ces"
+OCR_WORKERS = os.cpu_count() or 1
+OCR_MAX_IN_FLIGHT = 2 * OCR_WORKERS
+# Stránka s méně znaky textové vrstvy (např. jen číslo strany) se bere jako sken
+OCR_MIN_CHARS = 10
+
+_pool = None
+
+
+def _get_pool():
+    global _pool
+    if _pool is None:
+        _pool = ProcessPoolExecutor(max_workers=OCR_WORKERS)
+    return _pool
+
+
+def _ocr_page(png, lang, tesseract_cmd):
+    # Běží ve worker procesu
+    from PIL import Image
+    import pytesseract
+    pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    return pytesseract.image_to_string(Image.open(io.BytesIO(png)), lang=lang)
+
+
+def render_page(page, dpi=OCR_DPI):
+    return page.get_pixmap(dpi=dpi).tobytes("png")
+
+
+def ocr_pages(doc, page_numbers, dpi=OCR_DPI, max_in_flight=OCR_MAX_IN_FLIGHT, lang=OCR_LANG):
+    # Vrací {číslo stránky: text}; do poolu se posílá vždy jen jedna vyrenderovaná stránka
+    pool = _get_pool()
+    in_flight = deque()
+    results = {}
+
+    for number in page_numbers:
+        if len(in_flight) >= max_in_flight:
+            done_number, future = in_flight.popleft()
+            results[done_number] = future.result()
+        png = render_page(doc[number], dpi)
+        in_flight.append((number, pool.submit(_ocr_page, png, lang, TESSERACT_CMD)))
+
+    for number, future in in_flight:
+        results[number] = future.result()
+    return results
+
+
+def ocr_pdf(path, dpi=OCR_DPI, max_in_flight=OCR_MAX_IN_FLIGHT, lang=OCR_LANG):
+    doc = fitz.open(path)
+    try:
+        results = ocr_pages(doc, range(len(doc)), dpi, max_in_flight, lang)
+    finally:
+        doc.close()
+    return "".join(results[number] + "\n" for number in sorted(results))
+
+
+def pdf_text_with_ocr(path, dpi=OCR_DPI, max_in_flight=OCR_MAX_IN_FLIGHT, lang=OCR_LANG, timer=None):
+    # Text po stránkách; přes tesseract jdou jen stránky bez textové vrstvy.
+    # Vrací (text, počet OCR stránek), stránky jsou v původním pořadí.
+    # Do timer (timing.StageTimer) se zapíšou časy otevření, textu a OCR.
+    timer = timer or StageTimer()
+    with timer.stage("otevreni"):
+        doc = fitz.open(path)
+    try:
+        with timer.stage("text"):
+            pages = [page.get_text() for page in doc]
+        scanned = [i for i, text in enumerate(pages) if len(text.strip()) < OCR_MIN_CHARS]
+        if scanned:
+            print(f"🔍 Stránky bez textu ({len(scanned)}/{len(pages)}), spouštím OCR...")
+            with timer.stage("ocr"):
+                for number, text in ocr_pages(doc, scanned, dpi, max_in_flight, lang).items():
+                    pages[number] = text + "\n"
+            timer.info["ocr_stranek"] = len(scanned)
+    finally:
+        doc.close()
+    return "".join(pages), len(scanned)
+
+
+def shutdown():
+    global _pool
+    if _pool is not None:
+        _pool.shutdown()
+        _pool = None
@@ -1,10 +1,10 @@
 import os
 import re
 import fitz
-import pandas as pd
 import time
 from watchdog.observers import Observer
 from watchdog.events import FileSystemEventHandler
+from evidence import CsvEvidenceSink
 
 WATCH_FOLDER = r"/Users/jirieifler/POJISTOVNY/PDFka"
 CSV_PATH = r"/Users/jirieifler/POJISTOVNY/EVIDENCE_UDAJE_AUTA.csv"
@@ -25,6 +25,7 @@ def extract_common_fields():
     }
 
 COLUMNS = list(extract_common_fields().keys())
+EVIDENCE = CsvEvidenceSink(CSV_PATH, COLUMNS)
 
 def extract_data_allianz(text, filename):
     lines = text.splitlines()
@@ -160,15 +161,7 @@ class PDFHandler(FileSystemEventHandler):
                 print("❌ Nepodporovaná pojišťovna – přeskočeno.")
                 return
 
-            df_new = pd.DataFrame([[data.get(col, "") for col in COLUMNS]], columns=COLUMNS)
-
-            if os.path.exists(CSV_PATH):
-                df_old = pd.read_csv(CSV_PATH)
-                df_full = pd.concat([df_old, df_new], ignore_index=True)
-            else:
-                df_full = df_new
-
-            df_full.to_csv(CSV_PATH, index=False)
+            EVIDENCE.append(data)
             os.rename(event.src_path, os.path.join(SORTED_FOLDER, filename))
             print("✅ Data zapsána a soubor přesunut.")
 
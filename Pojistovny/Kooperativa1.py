@@ -2,16 +2,28 @@ import os
 import time
 import shutil
 import fitz  # PyMuPDF
-import pandas as pd
 import re
+import queue
 from datetime import datetime
+from watchdog.observers import Observer
+from watchdog.events import FileSystemEventHandler
+from evidence import CsvEvidenceSink
+from extractors import COLUMNS
+from cache import file_hash
+from line_index import LineIndex
+import stability
+from sections import koop_kryti
 
 # Cesty na tvém Macu
 WATCH_FOLDER = r"/Users/jirieifler/POJISTOVNY/PDFka"
 CSV_PATH = r"/Users/jirieifler/POJISTOVNY/EVIDENCE_UDAJE_AUTA.csv"
 SORTED_FOLDER = r"/Users/jirieifler/POJISTOVNY/ZPRACOVANE"
 ERROR_FOLDER = r"/Users/jirieifler/POJISTOVNY/CHYBY"
+# Jak často (s) projít složku pro jistotu i bez událostí watchdogu (0 = nikdy)
+RECONCILE_INTERVAL = 300
 LOG_PATH = r"/Users/jirieifler/POJISTOVNY/log.txt"
+# Jedna evidence pro celý běh se sdílenými sloupci (stejné pořadí jako A+K+G_3.0)
+EVIDENCE = CsvEvidenceSink(CSV_PATH, COLUMNS)
 
 def log_error(message):
     with open(LOG_PATH, "a") as log_file:
@@ -28,26 +40,26 @@ def extract_data(text):
     def find_block(label, group=1):
         return find(rf"{label}\s+([^\n]*)", group)
 
-    lines = text.splitlines()
+    index = LineIndex(text)
 
     vlastnik_adresa = ""
-    for i, line in enumerate(lines):
-        if "Adresa sídla" in line:
-            addr_candidates = []
-            for j in range(i + 1, min(i + 4, len(lines))):
-                if re.search(r"\d{3} ?\d{2}", lines[j]) or "," in lines[j]:
-                    addr_candidates.append(lines[j].strip())
-            vlastnik_adresa = " ".join(addr_candidates).strip()
-            break
+    i = index.first_line("Adresa sídla", exact=True)
+    if i is not None:
+        addr_candidates = []
+        for line in index.window(i + 1, 3):
+            if re.search(r"\d{3} ?\d{2}", line) or "," in line:
+                addr_candidates.append(line.strip())
+        vlastnik_adresa = " ".join(addr_candidates).strip()
 
     shodny_provozovatel = "NE"
-    lines_lower = [l.lower() for l in lines]
-    for i, line in enumerate(lines_lower):
-        if "provozovatel" in line:
-            okolni = " ".join(lines_lower[i:i + 5])
-            if "shodný s pojistníkem" in okolni or "shodny s pojistnikem" in okolni:
-                shodny_provozovatel = "ANO"
-                break
+    for i in index.line_numbers("provozovatel"):
+        okolni = index.joined(i, 5)
+        if "shodný s pojistníkem" in okolni or "shodny s pojistnikem" in okolni:
+            shodny_provozovatel = "ANO"
+            break
+
+    vlastnik = index.first("vlastník")
+    typ_vlastnika = re.search(r"Typ osoby\s+([^\n]+)", text[vlastnik:]) if vlastnik != -1 else None
 
     data = {
         "Jméno a příjmení": find_block(r"Titul, jméno, příjmení"),
@@ -76,18 +88,14 @@ def extract_data(text):
         "Vlastník - Název": find_block(r"Vlastník\n\nNázev"),
         "Vlastník - IČO": find_block(r"IČO"),
         "Vlastník - Adresa": vlastnik_adresa,
-        "Vlastník - Typ osoby": (
-            re.search(r"Typ osoby\s+([^\n]+)", text[text.lower().find("vlastník"):])
-            .group(1).strip()
-            if "vlastník" in text.lower() and re.search(r"Typ osoby\s+([^\n]+)", text[text.lower().find("vlastník"):])
-            else ""
-        ),
+        "Vlastník - Typ osoby": typ_vlastnika.group(1).strip() if typ_vlastnika else "",
         "Vlastník - Plátce DPH": find_block(r"Plátce DPH"),
     }
 
-    kryti = re.search(r"Limit.*?na zdraví.*?(\d+\s*mil\.\s*Kč).*?škodě.*?(\d+\s*mil\.\s*Kč)", text, re.DOTALL)
+    # Jen v úseku za "Limit" s časovým rozpočtem (sections.py), ne .*? přes celý text
+    kryti = koop_kryti(text)
     if kryti:
-        data["Krytí PR"] = f"{kryti[1].replace(' ', '')}/{kryti[2].replace(' ', '')}"
+        data["Krytí PR"] = kryti
 
     rc = data["Rodné číslo"]
     if re.match(r"\d{6}", rc):
@@ -105,36 +113,82 @@ def process_pdf(file_path):
     doc.close()
     return extract_data(full_text)
 
+def zpracuj_soubor(full_path):
+    filename = os.path.basename(full_path)
+    if not stability.wait_until_stable(full_path):
+        print(f"⚠️ Soubor se nedopsal nebo zmizel – přeskočeno: {filename}")
+        return
+    try:
+        # Do CHYBY až po posledním neúspěšném pokusu
+        data = stability.with_retry(process_pdf, full_path)
+        data["Zdrojový soubor"] = filename
+        data["Otisk PDF"] = file_hash(full_path)
+        EVIDENCE.append(data)
+        shutil.move(full_path, os.path.join(SORTED_FOLDER, filename))
+        print(f"✅ Zpracováno a přesunuto: {filename}")
+    except Exception as e:
+        log_error(f"Chyba při zpracování {filename}: {e}")
+        shutil.move(full_path, os.path.join(ERROR_FOLDER, filename))
+        print(f"❌ Chyba u souboru {filename}, přesunut do CHYBY")
+
+def je_pdf(path):
+    return path.lower().endswith(".pdf")
+
+class PDFHandler(FileSystemEventHandler):
+    # Observer jen zařadí cestu do fronty, zpracování běží v hlavním vlákně
+    def __init__(self, fronta):
+        self.fronta = fronta
+
+    def on_created(self, event):
+        if not event.is_directory and je_pdf(event.src_path):
+            self.fronta.put(event.src_path)
+
+    def on_moved(self, event):
+        # Soubor přejmenovaný v rámci složky (např. dokončené stahování)
+        if (not event.is_directory and je_pdf(event.dest_path)
+                and os.path.dirname(event.dest_path) == os.path.dirname(event.src_path)):
+            self.fronta.put(event.dest_path)
+
+    def on_closed(self, event):
+        # Zavření zapsaného souboru (hlásí jen některé platformy)
+        if not event.is_directory and je_pdf(event.src_path):
+            self.fronta.put(event.src_path)
+
+def kontrola_slozky(fronta):
+    # Záchranný průchod složkou pro soubory, o kterých watchdog nedal vědět
+    with os.scandir(WATCH_FOLDER) as entries:
+        for entry in entries:
+            if entry.is_file() and je_pdf(entry.name):
+                fronta.put(entry.path)
+
 def main():
     print("📂 Sledování složky spuštěno...")
     os.makedirs(SORTED_FOLDER, exist_ok=True)
     os.makedirs(ERROR_FOLDER, exist_ok=True)
 
-    while True:
-        files = [f for f in os.listdir(WATCH_FOLDER) if f.lower().endswith(".pdf")]
-        if not files:
-            time.sleep(5)
-            continue
+    fronta = queue.Queue()
+    observer = Observer()
+    observer.schedule(PDFHandler(fronta), WATCH_FOLDER, recursive=False)
+    observer.start()
 
-        for filename in files:
-            full_path = os.path.join(WATCH_FOLDER, filename)
+    # Soubory, které ve složce leží už před spuštěním
+    kontrola_slozky(fronta)
+    posledni_kontrola = time.monotonic()
+    try:
+        while True:
             try:
-                data = process_pdf(full_path)
-                df_new = pd.DataFrame([data])
-                if os.path.exists(CSV_PATH):
-                    df_old = pd.read_csv(CSV_PATH)
-                    df_full = pd.concat([df_old, df_new], ignore_index=True)
-                else:
-                    df_full = df_new
-                df_full.to_csv(CSV_PATH, index=False)
-                shutil.move(full_path, os.path.join(SORTED_FOLDER, filename))
-                print(f"✅ Zpracováno a přesunuto: {filename}")
-            except Exception as e:
-                log_error(f"Chyba při zpracování {filename}: {e}")
-                shutil.move(full_path, os.path.join(ERROR_FOLDER, filename))
-                print(f"❌ Chyba u souboru {filename}, přesunut do CHYBY")
-
-        time.sleep(5)
+                full_path = fronta.get(timeout=1)
+            except queue.Empty:
+                if RECONCILE_INTERVAL and time.monotonic() - posledni_kontrola >= RECONCILE_INTERVAL:
+                    kontrola_slozky(fronta)
+                    posledni_kontrola = time.monotonic()
+                continue
+            # Stejný soubor může přijít z události i z kontroly složky – zpracovaný už ve složce není
+            if os.path.exists(full_path):
+                zpracuj_soubor(full_path)
+    except KeyboardInterrupt:
+        observer.stop()
+    observer.join()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
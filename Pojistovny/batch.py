@@ -0,0 +1,117 @@
+import os
+import sys
+import time
+import argparse
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from config import CSV_PATH, SORTED_FOLDER, CACHE_FOLDER, EVIDENCE_BACKEND, SQLITE_PATH, EVIDENCE_UPSERT
+from cache import ResultCache
+from evidence import open_sink, SqliteEvidenceSink
+from parquet_evidence import export_parquet, read_csv_rows
+from extractors import COLUMNS, CACHE_VERSION, process_pdf
+
+# Dávkové zpracování celé složky PDF (např. ZPRACOVANE/ pro přepočet evidence).
+# Text + extrakce běží paralelně v procesech, do evidence zapisuje jen hlavní proces.
+#
+#   python batch.py                      # přepočítá ZPRACOVANE/ do EVIDENCE_UDAJE_AUTA.csv
+#   python batch.py /cesta/k/PDF --csv vystup.csv --workers 4
+#   python batch.py --backend sqlite     # zápis do SQLITE_PATH
+#   python batch.py --parquet evidence.parquet   # po dávce i dataset pro analýzy (celý z evidence)
+
+
+def najdi_pdf(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith(".pdf"):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def zpracuj_pdf(path, cache=None):
+    # Běží ve worker procesu – vrací (soubor, data, chyba), nic nezapisuje
+    filename = os.path.basename(path)
+    try:
+        stav, data = process_pdf(path, cache)
+    except Exception as e:
+        return filename, None, str(e)
+    if stav == "bez_textu":
+        return filename, None, "text nenalezen"
+    if stav == "nepodporovano":
+        return filename, None, "nepodporovaná pojišťovna"
+    return filename, data, None
+
+
+def evidence_rows(backend, csv_path, sqlite_path):
+    # Aktuální řádky evidence (bez starších verzí přepsaných smluv)
+    if backend == "sqlite":
+        sink = SqliteEvidenceSink(sqlite_path, COLUMNS)
+        try:
+            yield from sink.rows()
+        finally:
+            sink.close()
+    else:
+        yield from read_csv_rows(csv_path, COLUMNS)
+
+
+def run_batch(folder, csv_path, workers=None, chunk=50, cache=None, backend="csv", sqlite_path=SQLITE_PATH,
+              upsert=False, parquet_folder=None):
+    paths = najdi_pdf(folder)
+    workers = workers or os.cpu_count() or 1
+    print(f"📂 {len(paths)} PDF ve složce {folder}, zpracovávám v {workers} procesech...")
+
+    sink = open_sink(backend, COLUMNS, csv_path, sqlite_path, upsert=upsert)
+    start = time.monotonic()
+    rows = []
+    ok = chyby = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for filename, data, error in executor.map(zpracuj_pdf, paths, repeat(cache), chunksize=4):
+            if error:
+                chyby += 1
+                print(f"❌ {filename}: {error}")
+                continue
+            rows.append(data)
+            ok += 1
+            if len(rows) >= chunk:
+                sink.append_many(rows)
+                rows = []
+    sink.append_many(rows)
+    sink.close()
+    if parquet_folder:
+        # Dataset se vymění celý, opakovaný běh nezdvojí řádky
+        pocet = export_parquet(evidence_rows(backend, csv_path, sqlite_path), COLUMNS, parquet_folder)
+        print(f"🧱 Parquet: {pocet} řádků evidence v {parquet_folder}.")
+
+    elapsed = time.monotonic() - start
+    rychlost = len(paths) / elapsed if elapsed else 0
+    print(f"✅ Hotovo: {ok} zapsáno, {chyby} chyb, {elapsed:.1f} s ({rychlost:.1f} PDF/s).")
+    return ok, chyby
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Dávkové vytěžení složky PDF do evidence.")
+    parser.add_argument("folder", nargs="?", default=SORTED_FOLDER)
+    parser.add_argument("--csv", default=CSV_PATH)
+    parser.add_argument("--backend", choices=("csv", "sqlite"), default=EVIDENCE_BACKEND)
+    parser.add_argument("--sqlite", default=SQLITE_PATH)
+    parser.add_argument("--parquet", default=None, help="složka Parquet datasetu přegenerovaného z evidence")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--pripsat", action="store_true", help="jen připisovat, bez přepisu duplicit")
+    parser.add_argument("--bez-cache", action="store_true", help="nepoužívat cache výsledků")
+    args = parser.parse_args(argv)
+
+    if not os.path.isdir(args.folder):
+        print(f"❌ Složka {args.folder} neexistuje.")
+        return 1
+    cache = None
+    if CACHE_FOLDER and not args.bez_cache:
+        cache = ResultCache(CACHE_FOLDER, CACHE_VERSION)
+    _, chyby = run_batch(args.folder, args.csv, args.workers, cache=cache,
+                         backend=args.backend, sqlite_path=args.sqlite,
+                         upsert=EVIDENCE_UPSERT and not args.pripsat, parquet_folder=args.parquet)
+    return 1 if chyby else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,415 @@
+import os
+import sys
+import json
+import math
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+import fitz
+import classifier
+from config import EVIDENCE_BACKEND
+from evidence import open_sink
+from extractors import COLUMNS, PageReader, extract_data, process_pdf
+
+# Benchmark celé cesty PDF -> evidence na syntetických smlouvách Allianz / Kooperativa / Generali.
+# Smlouvy se vygenerují přes PyMuPDF s vymyšlenými (anonymními) údaji, volitelně s dalšími
+# stránkami podmínek a jako skeny (stránka jen jako obrázek, bez textové vrstvy).
+# Pro každou fázi se měří dokumenty/s a p50/p95 latence. Každá fáze běží v samostatném
+# (nově spuštěném) procesu, takže špička RSS patří jen jí; hlásí se nárůst nad prázdným
+# procesem se stejnými importy. OCR jde přes ocr.py z Windows složky (AI/) – stejnou cestou
+# jako ve skriptech, které ho používají.
+#
+#   python benchmark.py                          # 30 smluv, 3 strany, 10 % skenů
+#   python benchmark.py --pocet 200 --stran 8 --skeny 0.25 --json vysledky.json
+#   python benchmark.py --porovnat vysledky.json # srovnání s dřívějším během
+
+INSURERS = ("allianz", "koop", "generali")
+STAGES = ("text", "klasifikace", "extrakce", "ocr", "zapis", "pipeline")
+SCAN_DPI = 150
+# ocr.py žije jen ve Windows složce, benchmark ho importuje odtud
+OCR_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir, "POJISTOVNY_workin_slozka", "AI")
+LINE_HEIGHT = 13
+FONT_SIZE = 10
+
+JMENA = ["Jan", "Petr", "Eva", "Jana", "Tomáš", "Lucie", "Martin", "Kateřina", "Jiří", "Věra"]
+PRIJMENI = ["Novák", "Svoboda", "Dvořák", "Černá", "Procházka", "Kučerová", "Veselý", "Horák", "Němcová", "Marek"]
+ULICE = ["Dlouhá", "Krátká", "Školní", "Nádražní", "Polní", "Lesní", "Zahradní", "Husova"]
+MESTA = [("Praha", "110 00"), ("Brno", "602 00"), ("Ostrava", "702 00"), ("Plzeň", "301 00"), ("Kolín", "280 02")]
+
+PODMINKY = (
+    "Pojištění se řídí příslušnými všeobecnými pojistnými podmínkami a zvláštními ujednáními. "
+    "Pojistitel poskytne pojistné plnění v rozsahu sjednaném v této smlouvě. "
+    "Pojistník je povinen oznámit pojistiteli bez zbytečného odkladu změnu údajů uvedených ve smlouvě. "
+)
+
+
+def _cislo(rng, digits):
+    return "".join(rng.choice("0123456789") for _ in range(digits))
+
+
+def _castka(value):
+    return f"{value:,}".replace(",", " ")
+
+
+def fake_contract(rng):
+    # Vymyšlené údaje jedné smlouvy (stejné pro všechny pojišťovny)
+    rok = rng.randint(1950, 2004)
+    mesic = rng.randint(1, 12)
+    den = rng.randint(1, 28)
+    mesto, psc = rng.choice(MESTA)
+    return {
+        "jmeno": f"{rng.choice(JMENA)} {rng.choice(PRIJMENI)}",
+        "rc": f"{rok % 100:02d}{mesic:02d}{den:02d}{_cislo(rng, 4)}",
+        "ulice": f"{rng.choice(ULICE)} {rng.randint(1, 999)}",
+        "mesto": mesto,
+        "psc": psc,
+        "smlouva": _cislo(rng, 10),
+        "spz": f"{rng.randint(1, 9)}{rng.choice('ABCEHJKLMPST')}{rng.randint(1, 9)}{_cislo(rng, 4)}",
+        "pocatek": f"{rng.randint(1, 28)}. {rng.randint(1, 12)}. {rng.randint(2022, 2026)}",
+        "cena": rng.randint(2500, 30000),
+        "cena_vozidla": rng.randint(80, 900) * 1000,
+        "km": rng.randint(1000, 250000),
+        "telefon": f"{rng.randint(601, 799)} {_cislo(rng, 3)} {_cislo(rng, 3)}",
+        "email": f"klient{_cislo(rng, 5)}@example.com",
+        "vin": f"TMBJJ7NE{_cislo(rng, 9)}",
+    }
+
+
+def allianz_lines(c):
+    return [
+        "Allianz pojišťovna, a.s.",
+        f"Nabídka pojistitele č. {c['smlouva'][:9]}",
+        "Klient (Vy):",
+        c["jmeno"],
+        f"Rodné číslo: {c['rc']}",
+        "Adresa – trvalý pobyt",
+        "",
+        f"{c['ulice']}, {c['mesto']}, {c['psc'].replace(' ', '')}",
+        f"Vozidlo {c['spz']}, č. VIN {c['vin']}",
+        f"CENA POJIŠTĚNÍ {_castka(c['cena'])} KČ ROČNĚ {c['pocatek']}",
+        "Roční nájezd: Do 15 000 km",
+        f"Mobilní telefon: +420{c['telefon'].replace(' ', '')}",
+        f"E-mail: {c['email']}",
+    ], [
+        "Povinné ručení limit 70/70",
+        "Držitel/provozovatel je shodný s pojistníkem",
+        "Vlastník vozidla je shodný s pojistníkem",
+        "Právní poradenství ano",
+        "Havárie ano",
+        f"Cena vozidla: {_castka(c['cena_vozidla'])} Kč",
+        f"Najeté km: {_castka(c['km'])}",
+        "Vaše pojistné",
+        "celkem ročně",
+        f"{_castka(c['cena'])} Kč",
+    ]
+
+
+def koop_lines(c):
+    return [
+        "Kooperativa pojišťovna, a.s., Vienna Insurance Group",
+        f"Číslo pojistné smlouvy {c['smlouva']}",
+        "Pojistník",
+        f"Titul, jméno, příjmení {c['jmeno']}",
+        f"Rodné číslo {c['rc']}",
+        f"Adresa bydliště {c['ulice']}, {c['psc']} {c['mesto']}, ČR",
+        f"Mobil {c['telefon']}",
+        f"E-mail {c['email']}",
+        "Typ osoby fyzická osoba, občan",
+        "Provozovatel",
+        "je shodný s pojistníkem",
+        f"Registrační značka {c['spz']} osobní",
+        f"Pojistná částka {_castka(c['cena_vozidla'])}",
+        f"Stav počítadla (km) {_castka(c['km'])}",
+        f"Počátek pojištění {c['pocatek']}",
+    ], [
+        "Limit pojistného plnění",
+        "na zdraví 100 mil. Kč",
+        "na škodě 100 mil. Kč",
+        "Doplňková pojištění",
+        "Pojištění asistenčních služeb",
+        "Pojištění skel",
+        "Roční pojistné",
+        f"Celkové roční pojistné {_castka(c['cena'])}",
+        "Havarijní pojištění",
+    ]
+
+
+def generali_lines(c):
+    return [
+        "Generali Česká pojišťovna a.s.",
+        f"Pojistná smlouva číslo: {c['smlouva']}",
+        "POJISTNÍK - fyzická osoba",
+        f"Titul, jméno, příjmení, titul za jménem: {c['jmeno']}",
+        f"Rodné číslo: {c['rc'][:6]}/{c['rc'][6:]}",
+        f"Telefon: +420 {c['telefon']}",
+        f"E-mail: {c['email']}",
+        f"Trvalá adresa: {c['ulice']}, {c['psc']} {c['mesto']}",
+        "POJISTNÁ DOBA",
+        f"s počátkem pojištění {c['pocatek']}",
+        "3.1 Vlastník vozidla: Leasing a.s.",
+        "3.2 Držitel (provozovatel) vozidla je shodný s pojistníkem",
+        "3.3 Údaje o vozidle",
+        f"Registrační značka: {c['spz']}",
+        "3.4 Další",
+    ], [
+        "Limit pojistného plnění 100 000 000 Kč na zdraví a škody na majetku 100 000 000 Kč",
+        f"Celkem roční pojistné {_castka(c['cena'])} Kč",
+        "4.2 Doplňková pojištění Sjednaný balíček Exclusive",
+        f"Cena vozidla: {c['cena_vozidla']}",
+        f"Najeté kilometry: {c['km']}",
+        "Plátce DPH: ano",
+    ]
+
+
+TEMPLATES = {"allianz": allianz_lines, "koop": koop_lines, "generali": generali_lines}
+
+
+def _write_page(page, lines, font):
+    writer = fitz.TextWriter(page.rect)
+    y = 50
+    for line in lines:
+        if y > page.rect.height - 40:
+            break
+        writer.append((50, y), line, font=font, fontsize=FONT_SIZE)
+        y += LINE_HEIGHT
+    writer.write_text(page)
+
+
+def make_pdf(path, insurer, contract, pages=3, scanned=False):
+    # Začátek smlouvy na první stránce, limity a cena na poslední, mezi nimi podmínky
+    head, tail = TEMPLATES[insurer](contract)
+    filler = [PODMINKY[i:i + 95] for i in range(0, len(PODMINKY), 95)] * 15
+    page_lines = [head] + [filler] * max(pages - 2, 0) + [tail]
+    if pages <= 1:
+        page_lines = [head + tail]
+
+    font = fitz.Font("helv")
+    doc = fitz.open()
+    for lines in page_lines:
+        _write_page(doc.new_page(), lines, font)
+
+    if scanned:
+        # Sken = stránky jen jako obrázky, bez textové vrstvy
+        scan = fitz.open()
+        for page in doc:
+            pixmap = page.get_pixmap(dpi=SCAN_DPI)
+            scan.new_page(width=page.rect.width, height=page.rect.height).insert_image(page.rect, pixmap=pixmap)
+        doc.close()
+        doc = scan
+    doc.save(path)
+    doc.close()
+
+
+def generate_corpus(folder, count, pages, scan_ratio, seed):
+    # Vrací [(cesta, pojišťovna, sken, údaje)]
+    rng = random.Random(seed)
+    corpus = []
+    for i in range(count):
+        insurer = INSURERS[i % len(INSURERS)]
+        contract = fake_contract(rng)
+        scanned = rng.random() < scan_ratio
+        path = os.path.join(folder, f"{insurer}_{i:04d}{'_sken' if scanned else ''}.pdf")
+        make_pdf(path, insurer, contract, pages, scanned)
+        corpus.append((path, insurer, scanned, contract))
+    return corpus
+
+
+def peak_rss_mb():
+    # Špička procesu včetně ukončených podprocesů (OCR workery a tesseract)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux hlásí kB, macOS bajty
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def percentile(values, p):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+
+def _load_ocr():
+    if OCR_FOLDER not in sys.path:
+        sys.path.append(OCR_FOLDER)
+    import ocr
+    # V ocr.py je cesta k tesseractu na Windows
+    ocr.TESSERACT_CMD = shutil.which("tesseract") or ocr.TESSERACT_CMD
+    return ocr
+
+
+def _read_text(path):
+    reader = PageReader()
+    doc = fitz.open(path)
+    try:
+        return "".join(reader(page) for page in doc)
+    finally:
+        doc.close()
+
+
+def _stage(stage, workdir):
+    # (funkce na jeden dokument, úklid po fázi)
+    if stage == "text":
+        return _read_text, lambda: None
+    if stage == "ocr":
+        ocr = _load_ocr()
+        return lambda path: ocr.pdf_text_with_ocr(path)[0], ocr.shutdown
+    if stage == "klasifikace":
+        return lambda text: classifier.classify_text(text)[0], lambda: None
+    if stage == "extrakce":
+        return lambda item: extract_data(*item), lambda: None
+    if stage == "zapis":
+        sink = open_sink(EVIDENCE_BACKEND, COLUMNS, os.path.join(workdir, "evidence.csv"),
+                         os.path.join(workdir, "evidence.sqlite"))
+        return sink.append, sink.close
+    if stage == "pipeline":
+        # Celá cesta jako ve watcheru (klasifikace z prvních stran, bez cache)
+        return process_pdf, lambda: None
+    return (lambda item: None), lambda: None
+
+
+def _run_stage(stage, items, workdir):
+    # Běží v samostatném procesu – vrací (časy, výsledky, špička RSS)
+    fn, cleanup = _stage(stage, workdir)
+    times = []
+    results = []
+    try:
+        for item in items:
+            start = time.perf_counter()
+            results.append(fn(item))
+            times.append(time.perf_counter() - start)
+    finally:
+        cleanup()
+    return times, results, peak_rss_mb()
+
+
+def run_stage(stage, items, workdir):
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+        return executor.submit(_run_stage, stage, list(items), workdir).result()
+
+
+def run_benchmark(corpus, workdir, ocr=True):
+    timings = {}
+    rss = {}
+    spatne = []
+    if ocr:
+        try:
+            import pytesseract  # noqa: F401
+        except ImportError:
+            print("⚠️ pytesseract není nainstalovaný – fáze OCR se přeskočí.")
+            ocr = False
+    if ocr and not os.path.exists(_load_ocr().TESSERACT_CMD):
+        print("⚠️ tesseract nenalezen – fáze OCR se přeskočí.")
+        ocr = False
+
+    _, _, zaklad = run_stage("zaklad", [], workdir)
+
+    def measure(stage, items):
+        if not items:
+            return []
+        times, results, peak = run_stage(stage, items, workdir)
+        timings[stage] = times
+        rss[stage] = peak - zaklad if peak is not None and zaklad is not None else None
+        return results
+
+    texts = measure("text", [path for path, _, _, _ in corpus])
+    skeny = [i for i, (_, _, scanned, _) in enumerate(corpus) if scanned]
+    if ocr:
+        for i, text in zip(skeny, measure("ocr", [corpus[i][0] for i in skeny])):
+            texts[i] = text
+    pouzite = [i for i, (_, _, scanned, _) in enumerate(corpus) if ocr or not scanned]
+
+    vytezit = []
+    for i, detected in zip(pouzite, measure("klasifikace", [texts[i] for i in pouzite])):
+        path, insurer, _, _ = corpus[i]
+        if detected != insurer:
+            spatne.append(f"{os.path.basename(path)}: pojišťovna {detected}")
+            continue
+        vytezit.append(i)
+
+    rows = measure("extrakce", [(texts[i], os.path.basename(corpus[i][0]), corpus[i][1]) for i in vytezit])
+    for i, data in zip(vytezit, rows):
+        path, _, scanned, contract = corpus[i]
+        # Koop má za SPZ ještě druh vozidla ("1AB2345 osobní")
+        if not scanned and not data["SPZ"].startswith(contract["spz"]):
+            spatne.append(f"{os.path.basename(path)}: SPZ {data['SPZ']!r}")
+    measure("zapis", rows)
+    measure("pipeline", [path for path, _, scanned, _ in corpus if not scanned])
+    return summarize(timings, rss), spatne
+
+
+def summarize(timings, rss):
+    summary = {}
+    for stage in STAGES:
+        values = timings.get(stage)
+        if not values:
+            continue
+        total = sum(values)
+        summary[stage] = {
+            "dokumentu": len(values),
+            "dok_za_s": len(values) / total if total else 0.0,
+            "p50_ms": percentile(values, 50) * 1000,
+            "p95_ms": percentile(values, 95) * 1000,
+            "rss_mb": rss.get(stage),
+        }
+    return summary
+
+
+def print_summary(summary, previous=None):
+    print(f"{'fáze':<12} {'dok.':>6} {'dok/s':>10} {'p50 ms':>10} {'p95 ms':>10} {'+RSS MB':>8}")
+    for stage, row in summary.items():
+        rss = f"{row['rss_mb']:.1f}" if row["rss_mb"] is not None else "-"
+        line = (f"{stage:<12} {row['dokumentu']:>6} {row['dok_za_s']:>10.1f} "
+                f"{row['p50_ms']:>10.2f} {row['p95_ms']:>10.2f} {rss:>8}")
+        if previous and stage in previous and previous[stage]["p95_ms"]:
+            zmena = row["p95_ms"] / previous[stage]["p95_ms"] - 1
+            line += f"   p95 {zmena:+.0%}"
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark vytěžování na syntetických smlouvách.")
+    parser.add_argument("--pocet", type=int, default=30, help="počet smluv (střídají se pojišťovny)")
+    parser.add_argument("--stran", type=int, default=3, help="stran na smlouvu")
+    parser.add_argument("--skeny", type=float, default=0.1, help="podíl naskenovaných smluv (0–1)")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--slozka", default=None, help="kam uložit korpus (jinak dočasná složka)")
+    parser.add_argument("--bez-ocr", action="store_true")
+    parser.add_argument("--json", default=None, help="uložit výsledky do JSON")
+    parser.add_argument("--porovnat", default=None, help="JSON s výsledky dřívějšího běhu")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="benchmark_") as tmp:
+        folder = args.slozka or os.path.join(tmp, "korpus")
+        os.makedirs(folder, exist_ok=True)
+        print(f"📄 Generuji {args.pocet} smluv ({args.stran} str., skeny {args.skeny:.0%}) do {folder}...")
+        corpus = generate_corpus(folder, args.pocet, args.stran, args.skeny, args.seed)
+        summary, spatne = run_benchmark(corpus, tmp, ocr=not args.bez_ocr)
+
+    previous = None
+    if args.porovnat:
+        with open(args.porovnat, encoding="utf-8") as f:
+            previous = json.load(f)["fáze"]
+    print_summary(summary, previous)
+    for problem in spatne:
+        print(f"❌ {problem}")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"pocet": args.pocet, "stran": args.stran, "skeny": args.skeny, "seed": args.seed,
+                       "fáze": summary, "chyby": spatne}, f, ensure_ascii=False, indent=2)
+        print(f"💾 Výsledky uloženy do {args.json}.")
+    return 1 if spatne else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
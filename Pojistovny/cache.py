@@ -0,0 +1,80 @@
+import os
+import json
+import hashlib
+import tempfile
+
+# Cache výsledků podle obsahu PDF (sha256).
+# Text se ukládá jen podle hashe, výsledek extrakce podle hashe + verze extraktorů,
+# takže po úpravě extraktorů se znovu počítá jen extrakce, ne čtení PDF (ani OCR).
+# Text je po stránkách i s metadaty PDF, aby se pojišťovna z cache rozpoznala stejně
+# jako při čtení PDF (classifier.classify_pages).
+#
+#   CACHE/text/ab/abcdef....json
+#   CACHE/vysledky/<verze>/ab/abcdef....json
+
+
+def file_hash(path, chunk_size=1024 * 1024):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, folder, version):
+        self.folder = folder
+        self.version = str(version)
+
+    def _text_path(self, digest):
+        return os.path.join(self.folder, "text", digest[:2], digest + ".json")
+
+    def _result_path(self, digest):
+        return os.path.join(self.folder, "vysledky", self.version, digest[:2], digest + ".json")
+
+    def _write(self, path, content):
+        # Zápis přes dočasný soubor – paralelní workery nikdy neuvidí napůl zapsaný záznam
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def get_pages(self, digest):
+        # (metadata, texty stránek), nebo None
+        path = self._text_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except ValueError:
+            return None
+        return cached["metadata"], cached["stranky"]
+
+    def put_pages(self, digest, metadata, pages):
+        self._write(self._text_path(digest), json.dumps({"metadata": metadata, "stranky": pages}, ensure_ascii=False))
+
+    def get_result(self, digest):
+        # (stav, data, pojišťovna), nebo None
+        path = self._result_path(digest)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, encoding="utf-8") as f:
+                cached = json.load(f)
+        except ValueError:
+            return None
+        if "pojistovna" not in cached:
+            # Záznam ze starší verze bez pojišťovny – spočítá se znovu (z cache textu)
+            return None
+        return cached["stav"], cached["data"], cached["pojistovna"]
+
+    def put_result(self, digest, stav, data, insurer=None):
+        self._write(self._result_path(digest), json.dumps(
+            {"stav": stav, "data": data, "pojistovna": insurer}, ensure_ascii=False))
@@ -0,0 +1,79 @@
+import re
+import insurers
+
+# Rozpoznání pojišťovny z metadat PDF a prvních stránek.
+# Všechny pojišťovny se bodují v jednom průchodu (jeden regex přes všechna klíčová slova),
+# takže se text nemusí kvůli každé pojišťovně znovu převádět na malá písmena a prohledávat.
+# Další stránky se čtou jen tehdy, když první stránka nestačí na jisté rozhodnutí.
+
+# pojišťovna -> klíčová slova (malými písmeny); pořadí = priorita při shodném skóre.
+# Bere se z modulů v insurers/ bez jejich importu.
+KEYWORDS = insurers.keywords()
+
+# Kolik stránek nejvýš číst, než PDF odmítneme (None = všechny)
+CLASSIFY_MAX_PAGES = 3
+# Podíl skóre vítěze na celkovém skóre, od kterého se dál nečte
+MIN_CONFIDENCE = 0.6
+
+_pattern = None
+_owners = {}
+
+
+def _keyword_pattern():
+    global _pattern
+    if _pattern is None:
+        for insurer, words in KEYWORDS.items():
+            for word in words:
+                _owners[word] = insurer
+        alternatives = sorted(_owners, key=len, reverse=True)
+        _pattern = re.compile("|".join(re.escape(word) for word in alternatives), re.IGNORECASE)
+    return _pattern
+
+
+def score_text(text, scores=None):
+    # Přičte výskyty klíčových slov do scores {pojišťovna: počet}
+    if scores is None:
+        scores = dict.fromkeys(KEYWORDS, 0)
+    for match in _keyword_pattern().finditer(text):
+        scores[_owners[match.group(0).lower()]] += 1
+    return scores
+
+
+def best_match(scores):
+    # (pojišťovna, jistota 0–1), nebo (None, 0.0)
+    total = sum(scores.values())
+    if not total:
+        return None, 0.0
+    insurer = max(scores, key=lambda name: scores[name])
+    return insurer, scores[insurer] / total
+
+
+def classify_text(text):
+    # Pro text, který už je celý načtený (např. z cache)
+    return best_match(score_text(text))
+
+
+def _plain_text(page):
+    return page.get_text()
+
+
+def classify_pages(metadata, page_count, read_page, max_pages=CLASSIFY_MAX_PAGES):
+    # Metadata + první stránky; read_page(číslo) vrací text stránky.
+    # Vrací (pojišťovna, jistota, texty přečtených stránek) – přečtené stránky
+    # se pak při extrakci nečtou znovu.
+    scores = score_text(" ".join(str(value) for value in (metadata or {}).values() if value))
+    pages = []
+    limit = page_count if max_pages is None else min(max_pages, page_count)
+
+    insurer, confidence = best_match(scores)
+    for number in range(limit):
+        if insurer is not None and confidence >= MIN_CONFIDENCE and pages:
+            break
+        pages.append(read_page(number))
+        insurer, confidence = best_match(score_text(pages[-1], scores))
+    return insurer, confidence, pages
+
+
+def classify_document(doc, max_pages=CLASSIFY_MAX_PAGES, read_page=_plain_text):
+    # Otevřený fitz dokument; stránky čte read_page(stránka)
+    return classify_pages(doc.metadata, len(doc), lambda number: read_page(doc[number]), max_pages)
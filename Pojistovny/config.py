@@ -0,0 +1,43 @@
+# Cesty na Macu – sdílí je watcher (A+K+G_3.0.py) i dávkové zpracování (batch.py)
+WATCH_FOLDER = "/Users/jirieifler/POJISTOVNY/PDFka"
+CSV_PATH = "/Users/jirieifler/POJISTOVNY/EVIDENCE_UDAJE_AUTA.csv"
+SORTED_FOLDER = "/Users/jirieifler/POJISTOVNY/ZPRACOVANE"
+ERROR_FOLDER = "/Users/jirieifler/POJISTOVNY/CHYBY"
+
+# Kam se zapisuje evidence: "csv" (CSV_PATH) nebo "sqlite" (SQLITE_PATH, s indexy;
+# CSV/XLSX z ní vyrobí evidence_export.py)
+EVIDENCE_BACKEND = "csv"
+SQLITE_PATH = "/Users/jirieifler/POJISTOVNY/EVIDENCE_UDAJE_AUTA.sqlite"
+# Znovu zpracovaná smlouva (stejné číslo smlouvy, bez něj stejný obsah PDF)
+# nahradí svůj řádek v evidenci (v CSV hromadně, viz evidence.COMPACT_AFTER – do té doby
+# může CSV obsahovat i starší verze řádku, platí poslední)
+EVIDENCE_UPSERT = True
+
+# Fronta a workery watcheru
+EXTRACTION_WORKERS = 2
+QUEUE_SIZE = 100
+QUEUE_POLICY = "block"  # "block" nebo "drop"
+# Jak často (s) projít sledovanou složku i bez událostí watchdogu (0 = nikdy) – zařadí
+# soubory, které se nevešly do plné fronty, a soubory, o kterých watchdog nedal vědět
+RECONCILE_INTERVAL = 300
+
+# Cache výsledků podle obsahu PDF (None = vypnuto)
+CACHE_FOLDER = "/Users/jirieifler/POJISTOVNY/CACHE"
+
+# Čtení PDF po stránkách (režim, ve výchozím stavu vypnutý): jakmile mají všechna pole
+# pojišťovny konečnou hodnotu, další stránky se nečtou. Nejvýš se čte STREAM_MAX_PAGES
+# stránek z modulu pojišťovny (insurers/) – údaj za touto hranicí se v tomto režimu nenajde.
+STREAM_PAGES = False
+
+# Layout backend: stránky se čtou přes get_text("dict") a vybraná pole (pravidla Near)
+# se hledají podle polohy u štítku místo podle pořadí řádků v textu
+LAYOUT_BACKEND = False
+
+# Časy fází zpracování: JSON řádek za každé PDF (None = nelogovat) a souhrnné
+# histogramy ve výpisu watcheru každých TIMING_SUMMARY_INTERVAL s (0 = jen při ukončení)
+TIMING_LOG = "/Users/jirieifler/POJISTOVNY/casy_zpracovani.jsonl"
+TIMING_SUMMARY_INTERVAL = 3600
+
+# Metriky watcheru pro Prometheus na http://METRICS_HOST:METRICS_PORT/metrics (None = vypnuto)
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9108
@@ -0,0 +1,449 @@
+import os
+import csv
+import io
+import hashlib
+import sqlite3
+import tempfile
+import threading
+from contextlib import contextmanager
+
+# Zápis do evidence (EVIDENCE_UDAJE_AUTA.csv) bez načítání celé tabulky.
+# Každý řádek se jen připíše na konec souboru, takže cena zápisu nezávisí na počtu smluv.
+# Volitelně SQLite (SqliteEvidenceSink) s indexy pro dotazy bez čtení celé evidence.
+#
+# upsert=True: smlouva, která už v evidenci je, se připíše jako nová verze řádku a starší
+# verze se z CSV odstraní hromadně (zhutnění), až jich je compact_after, a při close().
+# Zápis tak zůstane připsáním na konec a celý soubor se přepíše jednou za dávku duplicit,
+# ne u každé. Mezi zhutněními proto CSV může obsahovat víc řádků se stejným klic_radku –
+# platí vždy poslední z nich (tak ho čte i parquet_evidence.read_csv_rows). SQLite řádek
+# přepisuje na místě, duplicity v něm nejsou.
+# Klíče existujících řádků se načtou jednou do paměti (a pak se jen doplňují o řádky,
+# které mezitím připsal jiný proces), takže kontrola duplicity je vyhledání v množině.
+
+# Po kolika přepsaných (starších) řádcích se CSV evidence zhutní
+COMPACT_AFTER = 50
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+
+def klic_radku(row, columns):
+    # Číslo smlouvy; bez něj otisk obsahu PDF (cache.file_hash ve sloupci "Otisk PDF") –
+    # stejné PDF má stejný klíč i po změně extraktorů. Řádky zapsané dřív bez otisku
+    # se poznají podle zdrojového souboru a otisku vytěžených hodnot.
+    cislo = str(row.get("Číslo smlouvy") or "").strip()
+    if cislo:
+        return "smlouva:" + cislo
+    otisk_pdf = str(row.get("Otisk PDF") or "").strip()
+    if otisk_pdf:
+        return "pdf:" + otisk_pdf
+    hodnoty = "\x1f".join(str(row.get(col) or "") for col in columns if col != "Zdrojový soubor")
+    otisk = hashlib.sha1(hodnoty.encode("utf-8")).hexdigest()
+    return f"soubor:{row.get('Zdrojový soubor') or ''}:{otisk}"
+
+
+@contextmanager
+def zamek_souboru(path):
+    # Zámek vedle souboru s evidencí, aby si dva procesy nezapisovaly do sebe
+    lock_path = path + ".lock"
+    with open(lock_path, "a+") as lock_file:
+        if os.name == "nt":
+            lock_file.seek(0)
+            msvcrt.locking(lock_file.fileno(), msvcrt.LK_LOCK, 1)
+        else:
+            fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if os.name == "nt":
+                lock_file.seek(0)
+                msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+            else:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+class CsvEvidenceSink:
+    def __init__(self, path, columns, fsync=False, atomic=True, lock=True, upsert=False,
+                 compact_after=COMPACT_AFTER):
+        self.path = path
+        self.columns = list(columns)
+        self.fsync = fsync
+        self.atomic = atomic
+        self.lock = lock
+        self.upsert = upsert
+        self.compact_after = compact_after
+        # Inode souboru, jehož hlavičku jsme naposledy přečetli (jiný = soubor někdo nahradil)
+        self._hlavicka_inode = None
+        self._thread_lock = threading.Lock()
+        # Index pro upsert: klíče řádků v souboru a počet řádků, které má soubor i v novější verzi
+        self._klice = set()
+        self._prekonane = 0
+        self._hlavicka_souboru = self.columns
+        self._indexovano_do = None
+        self._inode = None
+
+    def _hodnoty(self, row):
+        # Hodnoty v pořadí sloupců, jak je má hlavička souboru (ne nutně COLUMNS)
+        return [row.get(col, "") for col in self._hlavicka_souboru]
+
+    def _radek(self, values):
+        buffer = io.StringIO()
+        csv.writer(buffer, lineterminator="\n").writerow(values)
+        return buffer.getvalue()
+
+    def _zapis_hlavicku(self):
+        hlavicka = self._radek(self.columns)
+        if not self.atomic:
+            with open(self.path, "w", encoding="utf-8", newline="") as f:
+                f.write(hlavicka)
+                self._flush(f)
+            return
+
+        # Nový soubor vznikne přes dočasný soubor a os.replace, nikdy ne napůl zapsaný
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".evidence_", suffix=".csv", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                f.write(hlavicka)
+                self._flush(f)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _zkontroluj_hlavicku(self):
+        # Řádky se zapisují podle hlavičky existujícího souboru, i když má jiné pořadí sloupců.
+        # Sloupce, které v ní chybí (nové v COLUMNS), se jednou doplní na konec – starší řádky je mají prázdné.
+        with open(self.path, encoding="utf-8", newline="") as f:
+            hlavicka = next(csv.reader(f), []) or self.columns
+        chybi = [col for col in self.columns if col not in hlavicka]
+        if chybi:
+            print(f"🔁 {os.path.basename(self.path)}: doplňuji sloupce {', '.join(chybi)}.")
+            hlavicka = hlavicka + chybi
+            self._prepis(hlavicka, self._cti_radky())
+        elif hlavicka != self.columns:
+            print(f"ℹ️ {os.path.basename(self.path)} má jiné pořadí sloupců, řádky se zapíší podle jeho hlavičky.")
+        self._hlavicka_souboru = hlavicka
+        self._hlavicka_inode = os.stat(self.path).st_ino
+
+    def _cti_radky(self):
+        # Řádky celého souboru (bez hlavičky)
+        with open(self.path, encoding="utf-8", newline="") as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            return [values for values in reader if values]
+
+    def _prepis(self, hlavicka, radky):
+        # Celý soubor znovu přes dočasný soubor a os.replace
+        folder = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".evidence_", suffix=".csv", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as dst:
+                dst.write(self._radek(hlavicka))
+                for values in radky:
+                    dst.write(self._radek(values))
+                self._flush(dst)
+            os.replace(tmp_path, self.path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def _konci_novym_radkem(self):
+        with open(self.path, "rb") as f:
+            f.seek(0, os.SEEK_END)
+            if f.tell() == 0:
+                return True
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def _flush(self, f):
+        f.flush()
+        if self.fsync:
+            os.fsync(f.fileno())
+
+    def _obnov_index(self):
+        # Poprvé načte klíče celé evidence, potom jen řádky připsané za poslední známý konec.
+        # Jiné inode = soubor mezitím někdo přepsal (os.replace) -> načíst znovu celý.
+        stat = os.stat(self.path) if os.path.exists(self.path) else None
+        size = stat.st_size if stat else 0
+        inode = stat.st_ino if stat else None
+        if self._indexovano_do is None or size < self._indexovano_do or inode != self._inode:
+            self._inode = inode
+            self._klice = set()
+            self._prekonane = 0
+            self._indexovano_do = 0
+        if size == self._indexovano_do:
+            return
+        with open(self.path, "rb") as f:
+            f.seek(self._indexovano_do)
+            reader = csv.reader(io.StringIO(f.read().decode("utf-8"), newline=""))
+        if self._indexovano_do == 0:
+            self._hlavicka_souboru = next(reader, self.columns)
+        for values in reader:
+            if not values:
+                continue
+            klic = klic_radku(dict(zip(self._hlavicka_souboru, values)), self.columns)
+            if klic in self._klice:
+                self._prekonane += 1
+            self._klice.add(klic)
+        self._indexovano_do = size
+
+    def _rozdel_upsert(self, rows):
+        # Řádky k připsání – duplicity v dávce vyhraje poslední; klíč už v evidenci = další přepsaný řádek
+        nove = {}
+        for row in rows:
+            nove[klic_radku(row, self.columns)] = row
+        for klic in nove:
+            if klic in self._klice:
+                self._prekonane += 1
+            self._klice.add(klic)
+        return list(nove.values())
+
+    def _zhutni(self):
+        # Každý klíč jednou – na místě prvního výskytu s hodnotami posledního; přes dočasný soubor
+        with open(self.path, encoding="utf-8", newline="") as src:
+            reader = csv.reader(src)
+            hlavicka = next(reader, None) or self.columns
+            poradi = {}
+            for values in reader:
+                if values:
+                    poradi[klic_radku(dict(zip(hlavicka, values)), self.columns)] = values
+        self._prepis(hlavicka, poradi.values())
+        print(f"🔁 Evidence: odstraněno {self._prekonane} starších verzí řádků.")
+        self._prekonane = 0
+        stat = os.stat(self.path)
+        self._indexovano_do = stat.st_size
+        self._inode = stat.st_ino
+
+    def _append(self, rows):
+        if self.upsert:
+            self._obnov_index()
+            rows = self._rozdel_upsert(rows)
+            try:
+                self._pripis(rows)
+            except Exception:
+                # Index už obsahuje klíče nezapsaných řádků – příště se načte znovu
+                self._indexovano_do = None
+                raise
+            stat = os.stat(self.path)
+            self._indexovano_do = stat.st_size
+            self._inode = stat.st_ino
+            if self._prekonane >= self.compact_after:
+                self._zhutni()
+            return
+        self._pripis(rows)
+
+    def _pripis(self, rows):
+        stat = os.stat(self.path) if os.path.exists(self.path) else None
+        if stat is None or stat.st_size == 0:
+            self._zapis_hlavicku()
+            self._hlavicka_souboru = self.columns
+            self._hlavicka_inode = os.stat(self.path).st_ino
+        elif stat.st_ino != self._hlavicka_inode:
+            self._zkontroluj_hlavicku()
+
+        chunk = "".join(self._radek(self._hodnoty(row)) for row in rows)
+        if not self._konci_novym_radkem():
+            chunk = "\n" + chunk
+
+        # Celý blok jedním zápisem v režimu append
+        with open(self.path, "a", encoding="utf-8", newline="") as f:
+            f.write(chunk)
+            self._flush(f)
+
+    def append_many(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        with self._thread_lock:
+            if self.lock:
+                with zamek_souboru(self.path):
+                    self._append(rows)
+            else:
+                self._append(rows)
+
+    def append(self, row):
+        self.append_many([row])
+
+    def _zhutni_pri_zavreni(self):
+        self._obnov_index()
+        if self._prekonane:
+            self._zhutni()
+
+    def close(self):
+        # Soubor se drží otevřený jen během zápisu; při ukončení se odstraní starší verze řádků
+        if not self.upsert or not os.path.exists(self.path):
+            return
+        with self._thread_lock:
+            if self.lock:
+                with zamek_souboru(self.path):
+                    self._zhutni_pri_zavreni()
+            else:
+                self._zhutni_pri_zavreni()
+
+
+def _sloupec(name):
+    # Názvy sloupců jsou česky s mezerami – v SQL v uvozovkách
+    return '"' + name.replace('"', '""') + '"'
+
+
+class SqliteEvidenceSink:
+    # Evidence v SQLite. Indexy na INDEXED sloupcích, takže "máme už smlouvu X?"
+    # nebo "všechny smlouvy pro SPZ Y" je dotaz do indexu, ne čtení celé evidence.
+    # WAL: čtenáři (export, dotazy z jiného procesu) neblokují zápis watcheru.
+    INDEXED = ("Číslo smlouvy", "SPZ", "Rodné číslo", "Zdrojový soubor", "Otisk PDF")
+
+    def __init__(self, path, columns, table="evidence", upsert=False):
+        self.path = path
+        self.columns = list(columns)
+        self.table = table
+        self.upsert = upsert
+        self._thread_lock = threading.Lock()
+        # Index pro upsert: klíč -> id řádku; _posledni_id = kam až je načtený
+        self._klice = {}
+        self._posledni_id = 0
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._priprav_tabulku()
+
+    def _priprav_tabulku(self):
+        sloupce = ", ".join(f"{_sloupec(col)} TEXT" for col in self.columns)
+        with self._conn:
+            self._conn.execute(f"CREATE TABLE IF NOT EXISTS {self.table} (id INTEGER PRIMARY KEY, {sloupce})")
+            # Nové sloupce v COLUMNS se do existující tabulky doplní
+            existujici = {row[1] for row in self._conn.execute(f"PRAGMA table_info({self.table})")}
+            for col in self.columns:
+                if col not in existujici:
+                    self._conn.execute(f"ALTER TABLE {self.table} ADD COLUMN {_sloupec(col)} TEXT")
+            for i, col in enumerate(self.INDEXED):
+                if col in self.columns:
+                    self._conn.execute(
+                        f"CREATE INDEX IF NOT EXISTS idx_{self.table}_{i} ON {self.table} ({_sloupec(col)})"
+                    )
+
+    def _obnov_index(self):
+        # Poprvé klíče celé tabulky, potom jen řádky, které mezitím zapsal jiný proces
+        sloupce = ", ".join(_sloupec(col) for col in self.columns)
+        cursor = self._conn.execute(
+            f"SELECT id, {sloupce} FROM {self.table} WHERE id > ? ORDER BY id", (self._posledni_id,)
+        )
+        for row in cursor:
+            self._klice[klic_radku(dict(zip(self.columns, row[1:])), self.columns)] = row[0]
+            self._posledni_id = row[0]
+
+    def append_many(self, rows):
+        rows = list(rows)
+        if not rows:
+            return
+        sloupce = ", ".join(_sloupec(col) for col in self.columns)
+        otazniky = ", ".join("?" for _ in self.columns)
+        insert = f"INSERT INTO {self.table} ({sloupce}) VALUES ({otazniky})"
+        with self._thread_lock, self._conn:
+            if not self.upsert:
+                self._conn.executemany(insert, [[row.get(col, "") for col in self.columns] for row in rows])
+                return
+            self._obnov_index()
+            update = f"UPDATE {self.table} SET {', '.join(_sloupec(col) + ' = ?' for col in self.columns)} WHERE id = ?"
+            for row in rows:
+                values = [row.get(col, "") for col in self.columns]
+                klic = klic_radku(row, self.columns)
+                row_id = self._klice.get(klic)
+                if row_id is not None:
+                    self._conn.execute(update, values + [row_id])
+                else:
+                    row_id = self._conn.execute(insert, values).lastrowid
+                    self._klice[klic] = row_id
+                    self._posledni_id = max(self._posledni_id, row_id)
+
+    def append(self, row):
+        self.append_many([row])
+
+    def find(self, column, value):
+        # Řádky s danou hodnotou sloupce (u INDEXED sloupců přes index)
+        sloupce = ", ".join(_sloupec(col) for col in self.columns)
+        with self._thread_lock:
+            cursor = self._conn.execute(
+                f"SELECT {sloupce} FROM {self.table} WHERE {_sloupec(column)} = ? ORDER BY id", (value,)
+            )
+            return [dict(zip(self.columns, row)) for row in cursor.fetchall()]
+
+    def exists(self, column, value):
+        with self._thread_lock:
+            cursor = self._conn.execute(
+                f"SELECT 1 FROM {self.table} WHERE {_sloupec(column)} = ? LIMIT 1", (value,)
+            )
+            return cursor.fetchone() is not None
+
+    def rows(self):
+        # Všechny řádky v pořadí zápisu (po dávkách, ne celá tabulka najednou)
+        sloupce = ", ".join(_sloupec(col) for col in self.columns)
+        cursor = self._conn.cursor()
+        cursor.execute(f"SELECT {sloupce} FROM {self.table} ORDER BY id")
+        while True:
+            batch = cursor.fetchmany(500)
+            if not batch:
+                return
+            for row in batch:
+                yield dict(zip(self.columns, row))
+
+    def import_csv(self, csv_path, chunk=500):
+        # Převod dosavadní CSV evidence do databáze (s upsert=True opakovatelný bez duplicit)
+        pocet = 0
+        with open(csv_path, encoding="utf-8", newline="") as f:
+            rows = []
+            for row in csv.DictReader(f):
+                rows.append(row)
+                if len(rows) >= chunk:
+                    self.append_many(rows)
+                    pocet += len(rows)
+                    rows = []
+            self.append_many(rows)
+            pocet += len(rows)
+        return pocet
+
+    def export_csv(self, csv_path):
+        # Export přes dočasný soubor a os.replace, ať čtenář nikdy nevidí napůl zapsaný soubor
+        folder = os.path.dirname(os.path.abspath(csv_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".export_", suffix=".csv", dir=folder)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8", newline="") as f:
+                writer = csv.writer(f, lineterminator="\n")
+                writer.writerow(self.columns)
+                for row in self.rows():
+                    writer.writerow([row[col] for col in self.columns])
+            os.replace(tmp_path, csv_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def export_xlsx(self, xlsx_path):
+        import pandas as pd
+        folder = os.path.dirname(os.path.abspath(xlsx_path))
+        fd, tmp_path = tempfile.mkstemp(prefix=".export_", suffix=".xlsx", dir=folder)
+        os.close(fd)
+        try:
+            pd.DataFrame(list(self.rows()), columns=self.columns).to_excel(tmp_path, index=False)
+            os.replace(tmp_path, xlsx_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    def close(self):
+        with self._thread_lock:
+            self._conn.close()
+
+
+def open_sink(backend, columns, csv_path, sqlite_path, upsert=False):
+    # backend z configu: "csv" nebo "sqlite"
+    if backend == "sqlite":
+        return SqliteEvidenceSink(sqlite_path, columns, upsert=upsert)
+    if backend == "csv":
+        return CsvEvidenceSink(csv_path, columns, upsert=upsert)
+    raise ValueError(f"Neznámý backend evidence: {backend}")
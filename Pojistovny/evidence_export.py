@@ -0,0 +1,69 @@
+import os
+import sys
+import argparse
+from config import CSV_PATH, SQLITE_PATH
+from evidence import SqliteEvidenceSink
+from extractors import COLUMNS
+from parquet_evidence import export_parquet, read_csv_rows
+
+# Export SQLite evidence do CSV / XLSX / Parquet (podle přípony) a převod staré CSV evidence do databáze.
+#
+#   python evidence_export.py vystup.xlsx
+#   python evidence_export.py evidence.parquet          # složka datasetu rozdělená podle roku
+#   python evidence_export.py evidence.parquet --z-csv  # Parquet rovnou z CSV evidence
+#   python evidence_export.py EVIDENCE_UDAJE_AUTA.csv
+#   python evidence_export.py --import-csv /Users/jirieifler/POJISTOVNY/EVIDENCE_UDAJE_AUTA.csv
+#   python evidence_export.py --najdi "Číslo smlouvy" 6356462676
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Export a dotazy nad SQLite evidencí.")
+    parser.add_argument("cil", nargs="?", help="výstupní .csv, .xlsx nebo .parquet")
+    parser.add_argument("--db", default=SQLITE_PATH)
+    parser.add_argument("--z-csv", nargs="?", const=CSV_PATH, help="zdrojem pro .parquet je CSV evidence")
+    parser.add_argument("--import-csv", nargs="?", const=CSV_PATH, help="načíst CSV evidenci do databáze")
+    parser.add_argument("--najdi", nargs=2, metavar=("SLOUPEC", "HODNOTA"))
+    args = parser.parse_args(argv)
+
+    if args.z_csv:
+        if not args.cil or not args.cil.lower().endswith(".parquet"):
+            print("❌ --z-csv jde použít jen s výstupem .parquet")
+            return 1
+        pocet = export_parquet(read_csv_rows(args.z_csv, COLUMNS), COLUMNS, args.cil)
+        print(f"✅ {pocet} řádků z {args.z_csv} vyexportováno do {args.cil}.")
+        return 0
+
+    # Import s upsertem – opakovaný import stejné CSV řádky nezdvojí, jen je aktualizuje
+    sink = SqliteEvidenceSink(args.db, COLUMNS, upsert=bool(args.import_csv))
+    try:
+        if args.import_csv:
+            pocet = sink.import_csv(args.import_csv)
+            print(f"✅ Načteno {pocet} řádků z {args.import_csv}.")
+
+        if args.najdi:
+            sloupec, hodnota = args.najdi
+            if sloupec not in COLUMNS:
+                print(f"❌ Neznámý sloupec: {sloupec}")
+                return 1
+            for row in sink.find(sloupec, hodnota):
+                print({k: v for k, v in row.items() if v})
+
+        if args.cil:
+            pripona = os.path.splitext(args.cil)[1].lower()
+            if pripona == ".xlsx":
+                sink.export_xlsx(args.cil)
+            elif pripona == ".csv":
+                sink.export_csv(args.cil)
+            elif pripona == ".parquet":
+                export_parquet(sink.rows(), COLUMNS, args.cil)
+            else:
+                print("❌ Výstup musí být .csv, .xlsx nebo .parquet")
+                return 1
+            print(f"✅ Evidence vyexportována do {args.cil}.")
+    finally:
+        sink.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
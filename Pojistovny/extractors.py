@@ -0,0 +1,189 @@
+import os
+import time
+import fitz
+import classifier
+import insurers
+import layout
+from cache import file_hash
+from timing import StageTimer
+from config import STREAM_PAGES, LAYOUT_BACKEND
+
+# Extrakce údajů ze smluv pojišťoven.
+# Samostatný modul, aby extraktory šly použít z watcheru i z dávkového zpracování (batch.py).
+# Extraktory jednotlivých pojišťoven jsou pluginy v balíčku insurers/.
+
+def extract_common_fields():
+    return {
+        "Jméno a příjmení": "", "Rodné číslo": "", "Datum narození": "", "Adresa": "", "Číslo smlouvy": "",
+        "SPZ": "", "Cena vozidla": "", "Najeté km": "", "Roční nájezd": "", "Počátek pojištění": "", "Cena": "",
+        "Krytí PR": "", "Havarijní pojištění": "", "Další připojištění": "", "Telefon": "", "E-mail": "",
+        "Pojistník - Typ osoby": "", "Pojistník - Plátce DPH": "", "Shodný provozovatel": "", "Shodný vlastník": "",
+        "Provozovatel - Název": "", "Provozovatel - IČO": "", "Provozovatel - Adresa": "",
+        "Provozovatel - Typ osoby": "", "Provozovatel - Plátce DPH": "",
+        "Vlastník - Název": "", "Vlastník - IČO": "", "Vlastník - Adresa": "",
+        "Vlastník - Typ osoby": "", "Vlastník - Plátce DPH": "",
+        "Zdrojový soubor": "", "Otisk PDF": ""
+    }
+
+COLUMNS = list(extract_common_fields().keys())
+
+# Zvýšit při každé změně extraktorů – staré výsledky v cache se pak nepoužijí
+EXTRACTOR_VERSION = "3.3"
+# Výsledky při čtení po stránkách se mohou lišit od čtení celého PDF – v cache je držíme zvlášť
+CACHE_VERSION = EXTRACTOR_VERSION + ("-stream" if STREAM_PAGES else "") + ("-layout" if LAYOUT_BACKEND else "")
+
+
+def pdf_text(path):
+    doc = fitz.open(path)
+    text = "".join([page.get_text() for page in doc])
+    doc.close()
+    return text
+
+
+def extract_data(text, filename, insurer=None, layouts=(), timer=None):
+    # Vrací None, pokud pojišťovnu nepodporujeme
+    timer = timer or StageTimer()
+    if insurer is None:
+        with timer.stage("detekce"):
+            insurer, _ = classifier.classify_text(text)
+    if insurer is None:
+        return None
+    timer.info["pojistovna"] = insurer
+    with timer.stage("extrakce"):
+        return insurers.get(insurer).extract(text, filename, layouts, timer.fields)
+
+
+class PageReader:
+    # Čte text stránek; s use_layout=True zároveň sbírá jejich rozložení (layout.read_page),
+    # takže se každá stránka z PDF vytahuje jen jednou
+    def __init__(self, use_layout=LAYOUT_BACKEND, timer=None):
+        self.use_layout = use_layout
+        self.layouts = []
+        self.timer = timer or StageTimer()
+
+    def __call__(self, page):
+        with self.timer.stage("text"):
+            if not self.use_layout:
+                return page.get_text()
+            text, page_layout = layout.read_page(page)
+        self.layouts.append(page_layout)
+        return text
+
+
+def stream_pages(doc, insurer, pages, reader):
+    # Čte další stránky, dokud nemají konečnou hodnotu všechna pole pojišťovny, nejvýš však
+    # STREAM_MAX_PAGES stránek z jejího modulu (pole, které v PDF chybí, nebo příznak NE
+    # konečnou hodnotu nikdy nedostanou – dál se čtou jen pojistné podmínky).
+    # Pole se kontrolují po 1, 2, 4, 8… stránkách, takže indexování rostoucího textu
+    # stojí celkem nejvýš zhruba dvojnásobek jednoho čtení. Hodnoty se berou za hotové,
+    # až když je nezmění ani další kontrola (vzor na konci stránky může pokračovat na další).
+    module = insurers.get(insurer)
+    engine = module.ENGINE
+    limit = min(len(doc), getattr(module, "STREAM_MAX_PAGES", None) or len(doc))
+    previous = None
+    while len(pages) < limit:
+        text = "".join(pages)
+        values = engine.find(text, engine.scan(text, reader.layouts))
+        if engine.complete(values) and values == previous:
+            break
+        previous = values
+        target = min(limit, 2 * max(len(pages), 1))
+        while len(pages) < target:
+            pages.append(reader(doc[len(pages)]))
+    return pages
+
+
+def _minus_text(timer, stage, start, text_before):
+    # Čas fáze bez čtení stránek, které v ní proběhlo (to se počítá do "text")
+    elapsed = time.perf_counter() - start
+    timer.add(stage, elapsed - (timer.stages.get("text", 0.0) - text_before))
+
+
+def read_classified(path, stream=STREAM_PAGES, use_layout=LAYOUT_BACKEND, timer=None):
+    # Pojišťovna se pozná z metadat a prvních stránek, zbytek PDF se čte, jen když ji podporujeme
+    # (se stream=True jen do nalezení všech polí nebo do STREAM_MAX_PAGES pojišťovny).
+    # Vrací (pojišťovna, jistota, texty stránek, celý, rozložení, metadata), u nepodporovaného
+    # nebo streamovaného PDF mohou být stránky jen ty přečtené.
+    # Rozložení přečtených stránek jsou jen s use_layout.
+    timer = timer or StageTimer()
+    reader = PageReader(use_layout, timer)
+    with timer.stage("otevreni"):
+        doc = fitz.open(path)
+    try:
+        metadata = doc.metadata or {}
+        start, text_before = time.perf_counter(), timer.stages.get("text", 0.0)
+        insurer, confidence, pages = classifier.classify_document(doc, read_page=reader)
+        _minus_text(timer, "detekce", start, text_before)
+        if insurer is not None:
+            if stream:
+                start, text_before = time.perf_counter(), timer.stages.get("text", 0.0)
+                pages = stream_pages(doc, insurer, pages, reader)
+                _minus_text(timer, "kontrola_poli", start, text_before)
+            else:
+                pages += [reader(doc[number]) for number in range(len(pages), len(doc))]
+        complete = len(pages) == len(doc)
+    finally:
+        doc.close()
+    return insurer, confidence, pages, complete, reader.layouts, metadata
+
+
+def process_pdf(path, cache=None, stream=STREAM_PAGES, timer=None, use_layout=LAYOUT_BACKEND):
+    # Text + extrakce jednoho PDF; vrací (stav, data), stav je "ok", "bez_textu" nebo "nepodporovano".
+    # S cache se opakovaně vhozené PDF (stejný obsah) nečte ani nevytěžuje znovu.
+    # Do timer (timing.StageTimer) se zapisují časy jednotlivých fází.
+    timer = timer or StageTimer()
+    filename = os.path.basename(path)
+    cached_pages = None
+    layouts = ()
+    # Otisk obsahu je klíč cache a v evidenci identifikuje PDF bez čísla smlouvy
+    with timer.stage("otisk"):
+        digest = file_hash(path)
+    if cache is not None:
+        with timer.stage("cache"):
+            cached = cache.get_result(digest)
+        if cached is not None:
+            stav, data, insurer = cached
+            if insurer is not None:
+                timer.info["pojistovna"] = insurer
+            if data is not None:
+                data["Zdrojový soubor"] = filename
+                data["Otisk PDF"] = digest
+            return stav, data
+        # Rozložení stránek se do cache neukládají – s use_layout se PDF čte znovu
+        if not use_layout:
+            with timer.stage("cache"):
+                cached_pages = cache.get_pages(digest)
+
+    if cached_pages is not None:
+        metadata, pages = cached_pages
+        with timer.stage("detekce"):
+            insurer, confidence, _ = classifier.classify_pages(metadata, len(pages), pages.__getitem__)
+    else:
+        insurer, confidence, pages, complete, layouts, metadata = read_classified(path, stream, use_layout, timer)
+        if cache is not None and complete:
+            with timer.stage("cache"):
+                cache.put_pages(digest, metadata, pages)
+    if insurer is not None and confidence < classifier.MIN_CONFIDENCE:
+        print(f"⚠️ Nejistá pojišťovna ({insurer}, {confidence:.0%}): {filename}")
+
+    text = "".join(pages)
+    if not text.strip():
+        stav, data = "bez_textu", None
+    elif insurer is None:
+        stav, data = "nepodporovano", None
+    else:
+        data = extract_data(text, filename, insurer, layouts, timer)
+        data["Otisk PDF"] = digest
+        stav = "ok"
+
+    if cache is not None:
+        with timer.stage("cache"):
+            cache.put_result(digest, stav, data, insurer)
+    return stav, data
+
+
+def process_pdf_timed(path, cache=None, stream=STREAM_PAGES):
+    # Pro volání ve worker procesu: časy se vrátí spolu s výsledkem
+    timer = StageTimer()
+    stav, data = process_pdf(path, cache, stream, timer)
+    return stav, data, timer
@@ -0,0 +1,242 @@
+import time
+from line_index import LineIndex
+
+# Extrakce všech polí jedné pojišťovny v jednom průchodu textem.
+# Pravidla jsou deklarativní a každé má kotvu (štítek, např. "Rodné číslo").
+# Dokument se jednou zaindexuje (LineIndex: malá písmena, kotva -> pozice / řádky)
+# a pravidla pak hodnotu čtou jen v místě své kotvy místo prohledávání celého
+# textu regexem (a line.lower() po řádcích) pro každé pole.
+#
+# Podmínka pro kotvy: vzor pravidla musí začínat textem kotvy (bez ohledu na velikost písmen).
+# Víc pravidel pro stejné pole = náhradní varianty, vyhraje první nalezená.
+
+
+def _strip_group(match):
+    return match.group(1).strip()
+
+
+class Rule:
+    anchors = ()
+    default = ""
+
+    def resolve(self, doc):
+        # Vrací hodnotu, nebo None, pokud pole v dokumentu není
+        raise NotImplementedError
+
+    def is_final(self, value):
+        # Hodnotu pole už další text dokumentu nezmění (pro čtení po stránkách)
+        return value is not None
+
+    def __repr__(self):
+        # Např. AtAnchor('Cena', 'Celkové roční pojistné') – pro výpisy a profilování
+        anchor = self.anchors[0] if self.anchors else getattr(self, "label", None)
+        return f"{type(self).__name__}({self.field!r}" + (f", {anchor!r})" if anchor else ")")
+
+
+class AtAnchor(Rule):
+    # Vzor se zkouší jen na pozicích kotvy. S window se vzor zkouší jen v úseku
+    # window znaků od kotvy (vzory s .*? pak nedojdou až na konec dokumentu),
+    # s budget (s) se po vyčerpání času další pozice kotvy nezkoušejí.
+    def __init__(self, field, anchor, pattern, value=_strip_group, default="", window=None, budget=None):
+        self.field = field
+        self.anchors = (anchor,)
+        self.pattern = pattern
+        self.value = value
+        self.default = default
+        self.window = window
+        self.budget = budget
+
+    def resolve(self, doc):
+        deadline = time.perf_counter() + self.budget if self.budget else None
+        for pos in doc.positions(self.anchors[0]):
+            if self.window is None:
+                match = self.pattern.match(doc.text, pos)
+            else:
+                match = self.pattern.match(doc.text, pos, pos + self.window)
+            if match:
+                return self.value(match)
+            if deadline is not None and time.perf_counter() > deadline:
+                print(f"⏱️ {self.field}: hledání přerušeno po {self.budget * 1000:.0f} ms.")
+                return None
+        return None
+
+
+class Search(Rule):
+    # Vzor bez štítku (e-mail, SPZ…) – klasické hledání v celém textu
+    def __init__(self, field, pattern, value=_strip_group, default=""):
+        self.field = field
+        self.pattern = pattern
+        self.value = value
+        self.default = default
+
+    def resolve(self, doc):
+        match = self.pattern.search(doc.text)
+        return self.value(match) if match else None
+
+
+class Flag(Rule):
+    # ANO/NE podle výskytu kterékoli kotvy; s pattern musí vzor na kotvě i sednout,
+    # s exact=True musí sedět i velikost písmen
+    def __init__(self, field, *anchors, pattern=None, exact=False, yes="ANO", no="NE"):
+        self.field = field
+        self.anchors = anchors
+        self.pattern = pattern
+        self.exact = exact
+        self.yes = yes
+        self.default = no
+
+    def _found(self, doc, anchor):
+        for pos in doc.positions(anchor):
+            if self.pattern is not None:
+                if self.pattern.match(doc.text, pos):
+                    return True
+            elif not self.exact or doc.text.startswith(anchor, pos):
+                return True
+        return False
+
+    def resolve(self, doc):
+        if any(self._found(doc, anchor) for anchor in self.anchors):
+            return self.yes
+        return None
+
+
+class Keywords(Rule):
+    # Seznam popisků, jejichž kotva se v textu vyskytuje (v pořadí pravidla)
+    def __init__(self, field, labels, sep=", "):
+        self.field = field
+        self.labels = labels
+        self.anchors = tuple(anchor for anchor, _ in labels)
+        self.sep = sep
+
+    def resolve(self, doc):
+        found = [label for anchor, label in self.labels if doc.has(anchor)]
+        return self.sep.join(found) if found else None
+
+    def is_final(self, value):
+        # Další stránka může přidat další popisek – hotovo, až jsou nalezeny všechny
+        return value is not None and len(value.split(self.sep)) == len(self.labels)
+
+
+class NextLine(Rule):
+    # Řádek o offset níž než první řádek s kotvou (který takový řádek má)
+    def __init__(self, field, anchor, offset=1, default=""):
+        self.field = field
+        self.anchors = (anchor,)
+        self.offset = offset
+        self.default = default
+
+    def resolve(self, doc):
+        lines = doc.lines
+        for i in doc.line_numbers(self.anchors[0]):
+            if i + self.offset < len(lines):
+                return lines[i + self.offset].strip()
+        return None
+
+
+class FirstNonEmpty(Rule):
+    # První neprázdný z window řádků pod prvním řádkem s kotvou
+    def __init__(self, field, anchor, window=2, default=""):
+        self.field = field
+        self.anchors = (anchor,)
+        self.window = window
+        self.default = default
+
+    def resolve(self, doc):
+        first = doc.first_line(self.anchors[0])
+        if first is None:
+            return None
+        lines = doc.lines
+        for j in range(first + 1, first + 1 + self.window):
+            if j < len(lines) and lines[j].strip():
+                return lines[j].strip()
+        return None
+
+
+class InWindow(Rule):
+    # Vzor hledaný v window řádcích pod prvním řádkem s kotvou
+    def __init__(self, field, anchor, pattern, window=3, value=_strip_group, default=""):
+        self.field = field
+        self.anchors = (anchor,)
+        self.pattern = pattern
+        self.window = window
+        self.value = value
+        self.default = default
+
+    def resolve(self, doc):
+        first = doc.first_line(self.anchors[0])
+        if first is None:
+            return None
+        lines = doc.lines
+        for j in range(first + 1, first + 1 + self.window):
+            if j < len(lines):
+                match = self.pattern.search(lines[j])
+                if match:
+                    return self.value(match)
+        return None
+
+
+class Near(Rule):
+    # Hodnota podle polohy u štítku na stránce (layout backend); bez rozložení stránek
+    # vrací None, takže rozhodnou další (textová) pravidla pro stejné pole
+    def __init__(self, field, label, direction="auto", pattern=None, value=_strip_group, default=""):
+        self.field = field
+        self.label = label
+        self.direction = direction
+        self.pattern = pattern
+        self.value = value
+        self.default = default
+
+    def resolve(self, doc):
+        for layout in doc.layouts:
+            found = layout.value_for(self.label, self.direction, doc.labels)
+            if found is None:
+                continue
+            if self.pattern is None:
+                return found
+            match = self.pattern.search(found)
+            if match:
+                return self.value(match)
+        return None
+
+
+class FieldEngine:
+    def __init__(self, rules):
+        self.rules = list(rules)
+        self.anchors = sorted({anchor.lower() for rule in self.rules for anchor in rule.anchors})
+        # Kotvy i štítky pravidel Near (bez dvojtečky) – podle nich layout pozná štítek od hodnoty
+        self.labels = tuple(sorted(set(self.anchors) | {
+            rule.label.lower().rstrip(" :") for rule in self.rules if isinstance(rule, Near)}))
+        self._defaults = {}
+        for rule in self.rules:
+            self._defaults[rule.field] = rule.default
+
+    def scan(self, text, layouts=()):
+        return LineIndex(text, layouts, self.labels)
+
+    def find(self, text, index=None, timings=None):
+        # Hodnoty polí bez výchozích hodnot – None = pole v textu není.
+        # S timings (slovník) se do něj přičítá čas pravidel po polích.
+        doc = index if index is not None else self.scan(text)
+        values = {}
+        for rule in self.rules:
+            if values.get(rule.field) is not None:
+                continue
+            if timings is None:
+                values[rule.field] = rule.resolve(doc)
+                continue
+            start = time.perf_counter()
+            values[rule.field] = rule.resolve(doc)
+            timings[rule.field] = timings.get(rule.field, 0.0) + time.perf_counter() - start
+        return values
+
+    def complete(self, values):
+        # Všechna pole mají konečnou hodnotu (find bez výchozích hodnot)
+        return all(rule.is_final(values.get(rule.field)) for rule in self.rules)
+
+    def run(self, text, index=None, timings=None):
+        # index = sdílený LineIndex dokumentu, pokud už ho volající má
+        values = self.find(text, index, timings)
+        for field, value in values.items():
+            if value is None:
+                values[field] = self._defaults[field]
+        return values
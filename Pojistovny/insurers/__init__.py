@@ -0,0 +1,62 @@
+import os
+import ast
+import pkgutil
+import importlib
+
+# Registr extraktorů pojišťoven.
+# Každá pojišťovna je modul v tomto balíčku s konstantami KEYWORDS (klíčová slova
+# pro rozpoznání, malými písmeny) a PRIORITY a s funkcí extract(text, filename).
+# Při startu se moduly jen najdou a konstanty se přečtou ze zdrojáku (bez importu);
+# modul se importuje až při prvním PDF dané pojišťovny.
+# Novou pojišťovnu přidáš jen novým souborem v insurers/, nic dalšího se neupravuje.
+
+_registry = None
+_loaded = {}
+
+
+def _read_constants(path, names):
+    # Hodnoty jednoduchých přiřazení NAZEV = literál na úrovni modulu
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    values = {}
+    for node in tree.body:
+        if (isinstance(node, ast.Assign) and len(node.targets) == 1
+                and isinstance(node.targets[0], ast.Name) and node.targets[0].id in names):
+            values[node.targets[0].id] = ast.literal_eval(node.value)
+    return values
+
+
+def discover():
+    # {pojišťovna: klíčová slova}, seřazeno podle PRIORITY
+    global _registry
+    if _registry is None:
+        found = []
+        for info in pkgutil.iter_modules(__path__):
+            if info.ispkg or info.name.startswith("_"):
+                continue
+            path = os.path.join(info.module_finder.path, info.name + ".py")
+            constants = _read_constants(path, ("KEYWORDS", "PRIORITY"))
+            if not constants.get("KEYWORDS"):
+                print(f"⚠️ Modul pojišťovny {info.name} nemá KEYWORDS – přeskakuji.")
+                continue
+            found.append((constants.get("PRIORITY", 100), info.name, constants["KEYWORDS"]))
+        _registry = {name: keywords for _, name, keywords in sorted(found)}
+    return _registry
+
+
+def names():
+    return list(discover())
+
+
+def keywords():
+    return {name: list(words) for name, words in discover().items()}
+
+
+def get(name):
+    # Modul pojišťovny – importuje se při prvním použití
+    module = _loaded.get(name)
+    if module is None:
+        if name not in discover():
+            raise KeyError(f"Neznámá pojišťovna: {name}")
+        module = _loaded[name] = importlib.import_module(f"{__name__}.{name}")
+    return module
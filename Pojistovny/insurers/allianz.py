@@ -0,0 +1,78 @@
+import re
+from patterns import EMAIL, RC_PREFIX
+from field_engine import FieldEngine, AtAnchor, Search, Flag, Keywords, NextLine, FirstNonEmpty, InWindow, Near
+from extractors import extract_common_fields
+
+# Extraktor pro smlouvy Allianz.
+# Modul se importuje až při prvním PDF této pojišťovny (viz insurers/__init__.py).
+
+# Klíčová slova pro rozpoznání pojišťovny (malými písmeny) a priorita při shodném skóre
+KEYWORDS = ["allianz"]
+PRIORITY = 10
+# Údaje smlouvy jsou na prvních stránkách, dál bývají pojistné podmínky – při čtení po stránkách
+# (config.STREAM_PAGES) se víc stránek nečte (vzorová smlouva má všechna pole do 4. stránky z 5)
+STREAM_MAX_PAGES = 6
+
+PATTERNS = {
+    "Rodné číslo": re.compile(r"Rodné číslo:\s*(\d{9,10})"),
+    "SPZ": re.compile(r"([A-Z0-9]{5,8}), č\."),
+    "Číslo smlouvy": re.compile(r"Nabídka pojistitele č\.\s*(\d+)"),
+    "Počátek pojištění": re.compile(r"KČ ROČNĚ\s+(\d{1,2}\.\s*\d{1,2}\.\s*\d{4})"),
+    "Roční nájezd": re.compile(r"Roční nájezd:\s*(Do\s*[\d\s]+km)"),
+    "Telefon": re.compile(r"Mobilní telefon:\s*([\+0-9 ]+)"),
+    "E-mail": EMAIL,
+    "Cena vozidla": re.compile(r"Cena vozidla\s*[:\-]?\s*([\d\s]+)\s*Kč", re.IGNORECASE),
+    "Najeté km": re.compile(r"Najeté km\s*[:\-]?\s*([\d\s]+)", re.IGNORECASE),
+    "Cena": re.compile(r"([0-9]{1,3}(?:[ \u00A0]?[0-9]{3}))\s*Kč"),
+}
+
+ENGINE = FieldEngine([
+    # 1️⃣ Jméno, RČ
+    Near("Jméno a příjmení", "Klient (Vy):", direction="below"),
+    NextLine("Jméno a příjmení", "Klient (Vy):"),
+    AtAnchor("Rodné číslo", "Rodné číslo:", PATTERNS["Rodné číslo"]),
+    # 2️⃣ Adresa
+    # Adresa je vpravo vedle "Trvalý pobyt:" (pod ním už je štítek "Kontaktní adresa:")
+    Near("Adresa", "trvalý pobyt"),
+    FirstNonEmpty("Adresa", "trvalý pobyt", window=2),
+    # 3️⃣ SPZ
+    Search("SPZ", PATTERNS["SPZ"], value=lambda m: m.group(1)),
+    # 4️⃣ Číslo smlouvy
+    AtAnchor("Číslo smlouvy", "Nabídka pojistitele č.", PATTERNS["Číslo smlouvy"]),
+    # 6️⃣ Počátek pojištění
+    AtAnchor("Počátek pojištění", "KČ ROČNĚ", PATTERNS["Počátek pojištění"]),
+    # 7️⃣ Roční nájezd
+    AtAnchor("Roční nájezd", "Roční nájezd:", PATTERNS["Roční nájezd"]),
+    # 8️⃣ Telefon a e-mail
+    AtAnchor("Telefon", "Mobilní telefon:", PATTERNS["Telefon"]),
+    Search("E-mail", PATTERNS["E-mail"], value=lambda m: m.group(0)),
+    # 9️⃣ Krytí PR
+    Flag("Krytí PR", "limit 70/70", yes="70/70", no=""),
+    # 🔟 Shodný provozovatel a vlastník
+    Flag("Shodný provozovatel", "provozovatel je shodný"),
+    Flag("Shodný vlastník", "vlastník vozidla je shodný"),
+    # 1️⃣1️⃣ Další připojištění
+    Keywords("Další připojištění", [(f"{kw} ano", kw.capitalize()) for kw in ["právní poradenství", "úrazové pojištění"]]),
+    # 1️⃣2️⃣ Havarijní pojištění
+    Flag("Havarijní pojištění", *[f"{kw} ano" for kw in ["přírodní události", "poškození zvířetem", "havárie", "gap", "skla", "krádež"]]),
+    # 1️⃣3️⃣ Cena vozidla
+    AtAnchor("Cena vozidla", "Cena vozidla", PATTERNS["Cena vozidla"], value=lambda m: m.group(1).replace(" ", ""), default="neuvedeno"),
+    # 1️⃣4️⃣ Najeté km
+    AtAnchor("Najeté km", "Najeté km", PATTERNS["Najeté km"], value=lambda m: m.group(1).replace(" ", ""), default="neuvedeno"),
+    # 1️⃣5️⃣ Cena - formát pro Allianz (v následujících 3 řádcích pod "Vaše pojistné")
+    InWindow("Cena", "vaše pojistné", PATTERNS["Cena"], window=3,
+             value=lambda m: m.group(1).replace(" ", "").replace("\u00A0", ""), default="neuvedeno"),
+])
+
+def extract(text, filename, layouts=(), timings=None):
+    data = extract_common_fields()
+    data.update(ENGINE.run(text, ENGINE.scan(text, layouts), timings))
+    data["Zdrojový soubor"] = filename
+
+    rc = data["Rodné číslo"]
+    if RC_PREFIX.match(rc):
+        rok = int(rc[:2])
+        rok += 1900 if rok >= 50 else 2000
+        data["Datum narození"] = f"{rc[4:6]}.{rc[2:4]}.{rok}"
+
+    return data
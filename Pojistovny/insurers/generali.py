@@ -0,0 +1,138 @@
+import re
+from patterns import RC_PREFIX, label_value
+from field_engine import FieldEngine, AtAnchor, Flag
+from extractors import extract_common_fields
+from sections import SECTION_WINDOW, FIELD_BUDGET
+
+# Extraktor pro smlouvy Generali (Česká podnikatelská pojišťovna).
+# Modul se importuje až při prvním PDF této pojišťovny (viz insurers/__init__.py).
+
+# Klíčová slova pro rozpoznání pojišťovny (malými písmeny) a priorita při shodném skóre
+KEYWORDS = ["generali", "česká podnikatelská"]
+PRIORITY = 30
+# Údaje smlouvy jsou na prvních stránkách, dál bývají pojistné podmínky – při čtení po stránkách
+# (config.STREAM_PAGES) se víc stránek nečte (vzorová smlouva má všechna pole do 3. stránky z 5)
+STREAM_MAX_PAGES = 5
+
+PATTERNS = {
+    "blok POJISTNÍK": re.compile(
+        r"POJISTNÍK\s*-\s*fyzická osoba\s*(.*?)\n(?:PRACOVNÍK|POJISTNÁ|TECHNICKÉ|POJIŠTĚNÍ|$)",
+        re.DOTALL | re.IGNORECASE,
+    ),
+    "Jméno a příjmení": label_value("Titul, jméno, příjmení, titul za jménem"),
+    "Rodné číslo": label_value("Rodné číslo"),
+    "Telefon": label_value("Telefon"),
+    "E-mail": label_value("E-mail"),
+    "Adresa": label_value("Trvalá adresa"),
+    "Číslo smlouvy": re.compile(r"Pojistná smlouva číslo\s*:\s*(\d+)"),
+    "blok 3.3 Údaje o vozidle": re.compile(
+        r"3\.3\s+Údaje o vozidle\s*(.*?)\n(?:3\.4|POJIŠTĚNÍ|TECHNICKÉ|$)",
+        re.DOTALL | re.IGNORECASE,
+    ),
+    "SPZ": label_value("Registrační značka"),
+    "Počátek pojištění": re.compile(r"počátkem pojištění\s+(\d{1,2}\.\s*\d{1,2}\.\s*\d{4})", re.IGNORECASE),
+    # Hledá se jen v úseku SECTION_WINDOW znaků za štítkem (viz pravidlo níž);
+    # [\d\s]* místo \s*[\d\s]* – stejné shody bez zbytečného zkoušení rozdělení mezer
+    "Krytí PR": re.compile(
+        r"Limit pojistného plnění.*?(\d{2,3})[\d\s]*Kč.*?škody na majetku.*?(\d{2,3})[\d\s]*Kč",
+        re.DOTALL | re.IGNORECASE,
+    ),
+    "Cena": [
+        re.compile(r"Celkem roční pojistné.*?([0-9\s]{4,7})\s*Kč", re.IGNORECASE),
+        re.compile(r"Výše jednotlivé splátky.*?([0-9\s]{4,7})\s*Kč", re.IGNORECASE),
+        re.compile(r"Částka\s*([0-9\s]{4,7})\s*Kč", re.IGNORECASE),
+    ],
+    "Další připojištění": re.compile(r"4\.2\s+Doplňková pojištění\s+(.*)", re.IGNORECASE),
+    "Cena vozidla": re.compile(r"cena vozidla\s*[:\-]?\s*([0-9\s]{4,10})", re.IGNORECASE),
+    "Najeté km": re.compile(r"Najeté kilometry\s*[:\-]?\s*([0-9\s]{1,10})", re.IGNORECASE),
+    "Roční nájezd": re.compile(r"Roční nájezd\s*[:\-]?\s*([0-9\s]{1,10})", re.IGNORECASE),
+    "Pojistník - Plátce DPH": re.compile(r"Plátce DPH\s*[:\-]?\s*ano", re.IGNORECASE),
+    "Shodný provozovatel": re.compile(
+        r"3\.2\s+Držitel\s+\(provozovatel\)\s+vozidla\s+je\s+shodný\s+s\s+pojistníkem", re.IGNORECASE
+    ),
+    "Vlastník - Název": re.compile(r"3\.1\s+Vlastník vozidla:\s*(.+)"),
+}
+
+ENGINE = FieldEngine([
+    # 1️⃣ Blok POJISTNÍK (pole z něj se čtou níž)
+    AtAnchor("blok POJISTNÍK", "POJISTNÍK", PATTERNS["blok POJISTNÍK"], value=lambda m: m.group(1), default=None),
+    # 2️⃣ Číslo smlouvy
+    AtAnchor("Číslo smlouvy", "Pojistná smlouva číslo", PATTERNS["Číslo smlouvy"]),
+    # 3️⃣ Blok 3.3 Údaje o vozidle
+    AtAnchor("blok 3.3 Údaje o vozidle", "3.3", PATTERNS["blok 3.3 Údaje o vozidle"], value=lambda m: m.group(1), default=None),
+    # 4️⃣ Počátek pojištění
+    AtAnchor("Počátek pojištění", "počátkem pojištění", PATTERNS["Počátek pojištění"]),
+    # 5️⃣ Krytí PR – ve formátu 100/100 nebo 70/70
+    AtAnchor("Krytí PR", "Limit pojistného plnění", PATTERNS["Krytí PR"],
+             value=lambda m: f"{m.group(1).strip()}/{m.group(2).strip()}",
+             window=SECTION_WINDOW, budget=FIELD_BUDGET),
+    # 6️⃣ Cena – hledej přesně 9 787 nebo podobný formát (v tomto pořadí)
+    AtAnchor("Cena", "Celkem roční pojistné", PATTERNS["Cena"][0], value=lambda m: m.group(1).replace(" ", "")),
+    AtAnchor("Cena", "Výše jednotlivé splátky", PATTERNS["Cena"][1], value=lambda m: m.group(1).replace(" ", "")),
+    AtAnchor("Cena", "Částka", PATTERNS["Cena"][2], value=lambda m: m.group(1).replace(" ", "")),
+    # 7️⃣ Další připojištění – například "Sjednaný balíček Exclusive"
+    AtAnchor("Další připojištění", "4.2", PATTERNS["Další připojištění"]),
+    # 8️⃣ Havarijní pojištění – pokud se v textu zmiňuje o havarijním pojištění
+    ### ZDE ZKONTROLOVAT S KUBOU, U GENERALI TO NENÍ JASNÉ ###
+    ### ZATÍM TO VYCHÁZÍ NA ANO, ikdyž to tam výslovně není ###
+    Flag("Havarijní pojištění", "havarijní pojištění",
+         "poškození zvířetem", "přírodní události", "havárie", "skla", "krádež", "vandalismus", "gap"),
+    # 9️⃣ Cena vozidla – pokud je zmíněná
+    AtAnchor("Cena vozidla", "cena vozidla", PATTERNS["Cena vozidla"], value=lambda m: m.group(1).replace(" ", ""), default="neuvedeno"),
+    # 🔟 Najeté km – pokud je zmíněno
+    AtAnchor("Najeté km", "Najeté kilometry", PATTERNS["Najeté km"], value=lambda m: m.group(1).replace(" ", ""), default="neuvedeno"),
+    # 1️⃣1️⃣ Roční nájezd – pokud je zmíněno
+    AtAnchor("Roční nájezd", "Roční nájezd", PATTERNS["Roční nájezd"], value=lambda m: m.group(1).replace(" ", ""), default="neuvedeno"),
+    # 1️⃣2️⃣ Pojistník - Plátce DPH
+    Flag("Pojistník - Plátce DPH", "Plátce DPH", pattern=PATTERNS["Pojistník - Plátce DPH"], no="neuvedeno"),
+    # 1️⃣3 Shodný provozovatel
+    # SEM POTOM DOPSAT LOGIKU, KDYŽ BUDE NE, ABY VYPSALO NÁZEV,IČO, ADRESU APOD.
+    Flag("Shodný provozovatel", "3.2", pattern=PATTERNS["Shodný provozovatel"]),
+    # 1️⃣4 Vlastník - Název
+    AtAnchor("Vlastník - Název", "3.1", PATTERNS["Vlastník - Název"], default="neuvedeno"),
+])
+
+def extract(text, filename, layouts=(), timings=None):
+    data = extract_common_fields()
+    values = ENGINE.run(text, ENGINE.scan(text, layouts), timings)
+    data.update({k: v for k, v in values.items() if k in data})
+    data["Zdrojový soubor"] = filename
+    data["Shodný vlastník"] = "NE"
+
+    pojistnik_text = values["blok POJISTNÍK"]
+    if pojistnik_text is not None:
+
+        def from_block(field):
+            match = PATTERNS[field].search(pojistnik_text)
+            return match.group(1).strip() if match else ""
+
+        data["Jméno a příjmení"] = from_block("Jméno a příjmení")
+        data["Rodné číslo"] = from_block("Rodné číslo")
+        rc = data["Rodné číslo"].replace("/", "")
+        if RC_PREFIX.match(rc):
+            rok = int(rc[:2])
+            rok += 1900 if rok >= 50 else 2000
+            data["Datum narození"] = f"{rc[4:6]}.{rc[2:4]}.{rok}"
+        data["Telefon"] = from_block("Telefon")
+        data["E-mail"] = from_block("E-mail")
+        data["Adresa"] = from_block("Adresa")
+        data["Pojistník - Typ osoby"] = "fyzická osoba"
+    else:
+        print("❌ Blok POJISTNÍK nenalezen.")
+
+    if not data["Číslo smlouvy"]:
+        print("❌ Číslo smlouvy nenalezeno.")
+
+    vozidlo_text = values["blok 3.3 Údaje o vozidle"]
+    if vozidlo_text is not None:
+        match = PATTERNS["SPZ"].search(vozidlo_text)
+        data["SPZ"] = match.group(1).strip() if match else ""
+    else:
+        print("❌ Blok 3.3 Údaje o vozidle nenalezen.")
+
+    if not data["Počátek pojištění"]:
+        print("❌ Počátek pojištění nenalezen.")
+    if not data["Krytí PR"]:
+        print("❌ Krytí PR nenalezeno.")
+
+    return data
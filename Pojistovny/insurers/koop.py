@@ -0,0 +1,67 @@
+import re
+from patterns import EMAIL, RC_PREFIX, label_block
+from field_engine import FieldEngine, AtAnchor, Search, Flag, Near
+from extractors import extract_common_fields
+
+# Extraktor pro smlouvy Kooperativa.
+# Modul se importuje až při prvním PDF této pojišťovny (viz insurers/__init__.py).
+
+# Klíčová slova pro rozpoznání pojišťovny (malými písmeny) a priorita při shodném skóre
+KEYWORDS = ["kooperativa"]
+PRIORITY = 20
+# Údaje smlouvy jsou na prvních stránkách, dál bývají pojistné podmínky – při čtení po stránkách
+# (config.STREAM_PAGES) se víc stránek nečte (vzorová smlouva má všechna pole do 3. stránky z 6)
+STREAM_MAX_PAGES = 5
+
+PATTERNS = {
+    "Jméno a příjmení": label_block(r"Titul, jméno, příjmení"),
+    "Rodné číslo": re.compile(r"Rodné číslo\s+(\d{9,10})"),
+    "Adresa": label_block(r"Adresa bydliště"),
+    "Číslo smlouvy": re.compile(r"\b(\d{10})\b"),
+    "SPZ": label_block(r"Registrační značka"),
+    "Cena vozidla": re.compile(r"Pojistná částka\s+([\d\s]+)"),
+    "Najeté km": re.compile(r"Stav počítadla \(km\)\s+([\d\s]+)"),
+    "Počátek pojištění": re.compile(r"Počátek pojištění\s+(\d{1,2}\.\s*\d{1,2}\.\s*\d{4})"),
+    "Cena": re.compile(r"Celkové roční pojistné\s+([\d\s]+)"),
+    "Telefon": re.compile(r"Mobil\s+(\d{3} ?\d{3} ?\d{3})"),
+    "E-mail": EMAIL,
+    "Pojistník - Typ osoby": re.compile(r"Typ osoby\s+([^\n]+)"),
+    "blok Doplňková pojištění": re.compile(r"Doplňková pojištění(.*?)(?:Roční pojistné|$)", re.DOTALL),
+}
+
+def _koop_pripojisteni(match):
+    items = [r.strip() for r in match.group(1).split("\n") if "pojištění" in r.lower()]
+    return ", ".join(sorted(set(items)))
+
+ENGINE = FieldEngine([
+    # S layout backendem hodnota vedle štítku podle polohy, jinak do konce řádku v textu
+    Near("Jméno a příjmení", "Titul, jméno, příjmení"),
+    AtAnchor("Jméno a příjmení", "Titul, jméno, příjmení", PATTERNS["Jméno a příjmení"]),
+    AtAnchor("Rodné číslo", "Rodné číslo", PATTERNS["Rodné číslo"]),
+    Near("Adresa", "Adresa bydliště"),
+    AtAnchor("Adresa", "Adresa bydliště", PATTERNS["Adresa"]),
+    Search("Číslo smlouvy", PATTERNS["Číslo smlouvy"]),
+    Near("SPZ", "Registrační značka"),
+    AtAnchor("SPZ", "Registrační značka", PATTERNS["SPZ"]),
+    AtAnchor("Cena vozidla", "Pojistná částka", PATTERNS["Cena vozidla"], value=lambda m: m.group(1).strip().replace(" ", "")),
+    AtAnchor("Najeté km", "Stav počítadla (km)", PATTERNS["Najeté km"], value=lambda m: m.group(1).strip().replace(" ", "")),
+    AtAnchor("Počátek pojištění", "Počátek pojištění", PATTERNS["Počátek pojištění"]),
+    AtAnchor("Cena", "Celkové roční pojistné", PATTERNS["Cena"], value=lambda m: m.group(1).strip().replace(" ", "")),
+    AtAnchor("Telefon", "Mobil", PATTERNS["Telefon"]),
+    Search("E-mail", PATTERNS["E-mail"], value=lambda m: m.group(0)),
+    AtAnchor("Pojistník - Typ osoby", "Typ osoby", PATTERNS["Pojistník - Typ osoby"]),
+    AtAnchor("Další připojištění", "Doplňková pojištění", PATTERNS["blok Doplňková pojištění"], value=_koop_pripojisteni),
+    Flag("Havarijní pojištění", "Havarijní pojištění", exact=True),
+])
+
+def extract(text, filename, layouts=(), timings=None):
+    data = extract_common_fields()
+    data.update(ENGINE.run(text, ENGINE.scan(text, layouts), timings))
+    data["Zdrojový soubor"] = filename
+    rc = data["Rodné číslo"]
+    if RC_PREFIX.match(rc):
+        rok = int(rc[:2])
+        rok += 1900 if rok >= 50 else 2000
+        data["Datum narození"] = f"{rc[4:6]}.{rc[2:4]}.{rok}"
+
+    return data
@@ -0,0 +1,122 @@
+from collections import defaultdict
+
+# Rozložení stránky PDF podle souřadnic (volitelný backend, config.LAYOUT_BACKEND).
+# Stránka se čte jednou přes page.get_text("dict"): z řádků se složí stejný prostý text
+# jako z page.get_text() a zároveň se postaví prostorový index řádků
+# (pásy po ROW_BAND bodech na výšku). Hodnota ke štítku se pak hledá podle polohy –
+# za štítkem na stejném řádku, vpravo vedle něj, nebo pod ním – místo spoléhání
+# na pořadí řádků v textu.
+
+ROW_BAND = 12
+# Jak daleko (v bodech) pod štítkem ještě hledat hodnotu
+MAX_GAP_BELOW = 36
+# Tolerance pro "stejný řádek" a "pod štítkem" (nepřesné bboxy z PDF)
+TOLERANCE = 2
+
+
+def is_label(text, labels=()):
+    # Kandidát, který je sám štítkem ("Kontaktní adresa:", jiná známá kotva), není hodnota
+    text = text.strip()
+    if text.endswith(":"):
+        return True
+    lower = text.lower()
+    return any(lower.startswith(label) for label in labels)
+
+
+class LayoutLine:
+    __slots__ = ("x0", "y0", "x1", "y1", "text", "lower")
+
+    def __init__(self, bbox, text):
+        self.x0, self.y0, self.x1, self.y1 = bbox
+        self.text = text
+        self.lower = text.lower()
+
+
+class PageLayout:
+    def __init__(self, lines):
+        self.lines = lines
+        self._bands = defaultdict(list)
+        self._by_word = defaultdict(list)
+        for line in lines:
+            for band in range(int(line.y0 // ROW_BAND), int(line.y1 // ROW_BAND) + 1):
+                self._bands[band].append(line)
+            for word in set(line.lower.split()):
+                self._by_word[word].append(line)
+
+    def _in_bands(self, y0, y1):
+        seen = set()
+        for band in range(int(y0 // ROW_BAND), int(y1 // ROW_BAND) + 1):
+            for line in self._bands.get(band, ()):
+                if id(line) not in seen:
+                    seen.add(id(line))
+                    yield line
+
+    def labels(self, label):
+        # Řádky se štítkem (bez ohledu na velikost písmen) a pozice štítku v řádku
+        label = label.lower()
+        words = label.split()
+        for line in self._by_word.get(words[0], ()) if words else ():
+            index = line.lower.find(label)
+            if index != -1:
+                yield line, index + len(label)
+
+    def right_of(self, line):
+        # Nejbližší řádek vpravo, který se se štítkem překrývá na výšku
+        best = None
+        for other in self._in_bands(line.y0, line.y1):
+            if other is line or other.x0 < line.x1 - TOLERANCE:
+                continue
+            overlap = min(other.y1, line.y1) - max(other.y0, line.y0)
+            if overlap * 2 < min(other.y1 - other.y0, line.y1 - line.y0):
+                continue
+            if best is None or other.x0 < best.x0:
+                best = other
+        return best
+
+    def below(self, line, max_gap=MAX_GAP_BELOW):
+        # Řádky pod štítkem (do max_gap bodů), které se s ním překrývají na šířku, shora dolů
+        found = []
+        for other in self._in_bands(line.y1 - TOLERANCE, line.y1 + max_gap):
+            if other is line or other.y0 < line.y1 - TOLERANCE or other.y0 > line.y1 + max_gap:
+                continue
+            if other.x1 < line.x0 - TOLERANCE or other.x0 > line.x1 + TOLERANCE:
+                continue
+            found.append(other)
+        found.sort(key=lambda other: (other.y0, other.x0))
+        return found
+
+    def value_for(self, label, direction="auto", labels=()):
+        # direction: "auto" (stejný řádek -> vpravo -> pod), "right" nebo "below".
+        # Kandidáti vypadající jako štítek se přeskočí (labels = známé kotvy malými písmeny);
+        # pod štítkem hledání končí u dalšího štítku – níž už začíná jiné pole
+        for line, end in self.labels(label):
+            if direction == "auto":
+                rest = line.text[end:]
+                # Zbytek delšího štítku ("Titul, jméno, příjmení, titul za jménem:") není hodnota
+                if rest.strip(" :\t") and not rest.strip().endswith(":"):
+                    return rest.strip(" :\t")
+            if direction in ("auto", "right"):
+                other = self.right_of(line)
+                if other is not None and other.text.strip() and not is_label(other.text, labels):
+                    return other.text.strip()
+            if direction in ("auto", "below"):
+                for other in self.below(line):
+                    if not other.text.strip():
+                        continue
+                    if is_label(other.text, labels):
+                        break
+                    return other.text.strip()
+        return None
+
+def read_page(page):
+    # (prostý text stránky, PageLayout) z jediného page.get_text("dict")
+    lines = []
+    parts = []
+    for block in page.get_text("dict")["blocks"]:
+        if block.get("type", 0) != 0:
+            continue
+        for line in block["lines"]:
+            text = "".join(span["text"] for span in line["spans"])
+            parts.append(text + "\n")
+            lines.append(LayoutLine(line["bbox"], text))
+    return "".join(parts), PageLayout(lines)
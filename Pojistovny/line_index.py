@@ -0,0 +1,119 @@
+import re
+from bisect import bisect_right
+
+# Index řádků jednoho dokumentu – sestaví se jednou a sdílí ho všechny extraktory.
+#   - text i řádky převedené na malá písmena se počítají jen jednou
+#   - kotva (klíčové slovo) -> pozice / čísla řádků, každá kotva se hledá nejvýš jednou
+#   - okna řádků kolem kotvy (window, window_lower, joined)
+# Hledání kotev nerozlišuje velikost písmen, s exact=True musí sedět i ta.
+
+# Oddělovače řádků, které str.splitlines() bere kromě "\n"
+_OTHER_LINE_BREAKS = re.compile("[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]")
+
+
+class LineIndex:
+    def __init__(self, text, layouts=(), labels=()):
+        self.text = text
+        # Rozložení stránek (layout.PageLayout) pro pravidla hledající podle polohy; bez nich prázdné
+        self.layouts = layouts
+        # Známé štítky dokumentu (malými písmeny) – hodnota podle polohy nesmí být jiným štítkem
+        self.labels = labels
+        self.lower = text.lower()
+        # Výjimečné znaky mění délku při lower() – pak pozice hledáme regexem v původním textu
+        self._same_length = len(self.lower) == len(text)
+        self.hits = {}
+        self._complete = set()
+        self._line_hits = {}
+        self._lines = None
+        self._lower_lines = None
+        self._line_starts = None
+
+    # --- pozice kotev ---
+
+    def _find(self, anchor, start):
+        if self._same_length:
+            return self.lower.find(anchor, start)
+        match = re.compile(re.escape(anchor), re.IGNORECASE).search(self.text, start)
+        return match.start() if match else -1
+
+    def positions(self, anchor, exact=False):
+        # Výskyty kotvy se hledají až při prvním dotazu a ukládají se
+        key = anchor.lower()
+        cached = self.hits.setdefault(key, [])
+        i = 0
+        while True:
+            if i < len(cached):
+                pos = cached[i]
+                i += 1
+                if not exact or self.text.startswith(anchor, pos):
+                    yield pos
+                continue
+            if key in self._complete:
+                return
+            pos = self._find(key, cached[-1] + 1 if cached else 0)
+            if pos == -1:
+                self._complete.add(key)
+                return
+            cached.append(pos)
+
+    def has(self, anchor, exact=False):
+        return next(self.positions(anchor, exact), None) is not None
+
+    def first(self, anchor, exact=False):
+        return next(self.positions(anchor, exact), -1)
+
+    # --- řádky ---
+
+    @property
+    def lines(self):
+        if self._lines is None:
+            self._lines = self.text.splitlines()
+        return self._lines
+
+    @property
+    def lower_lines(self):
+        if self._lower_lines is None:
+            if self._same_length:
+                self._lower_lines = self.lower.splitlines()
+            else:
+                self._lower_lines = [line.lower() for line in self.lines]
+        return self._lower_lines
+
+    def line_number(self, pos):
+        if self._line_starts is None:
+            if _OTHER_LINE_BREAKS.search(self.text):
+                self._line_starts = []
+                start = 0
+                for line in self.text.splitlines(keepends=True):
+                    self._line_starts.append(start)
+                    start += len(line)
+            else:
+                self._line_starts = [0] + [m.end() for m in re.finditer("\n", self.text)]
+        return bisect_right(self._line_starts, pos) - 1
+
+    def line_numbers(self, anchor, exact=False):
+        # Čísla řádků s kotvou (každý řádek jednou, vzestupně)
+        key = (anchor.lower(), exact)
+        if key not in self._line_hits:
+            numbers = []
+            for pos in self.positions(anchor, exact):
+                number = self.line_number(pos)
+                if not numbers or numbers[-1] != number:
+                    numbers.append(number)
+            self._line_hits[key] = numbers
+        return self._line_hits[key]
+
+    def first_line(self, anchor, exact=False):
+        pos = self.first(anchor, exact)
+        return self.line_number(pos) if pos != -1 else None
+
+    # --- okna řádků ---
+
+    def window(self, start, size):
+        return self.lines[max(start, 0):start + size]
+
+    def window_lower(self, start, size):
+        return self.lower_lines[max(start, 0):start + size]
+
+    def joined(self, start, size, sep=" "):
+        return sep.join(self.window_lower(start, size))
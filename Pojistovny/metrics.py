@@ -0,0 +1,120 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import timing
+
+# Lokální HTTP endpoint s metrikami watcheru v textovém formátu Prometheus (GET /metrics).
+# Čítače dokumentů (podle stavu a pojišťovny), OCR a chyb se plní z handle_pdf,
+# histogramy fází bere z timing.py, stav fronty a složky se čte až při dotazu.
+#
+#   curl http://127.0.0.1:9108/metrics
+
+PREFIX = "pojistovny"
+
+_lock = threading.Lock()
+# (jméno, ((štítek, hodnota), ...)) -> hodnota
+_counters = {}
+
+HELP = {
+    "dokumenty_total": "Zpracovaná PDF podle výsledku a pojišťovny",
+    "ocr_stranky_total": "Stránky převedené přes OCR",
+    "chyby_total": "PDF přesunutá do složky s chybami",
+    "fronta_odmitnuto_total": "PDF, která se nevešla do plné fronty",
+    "faze_sekundy": "Doba fází zpracování jednoho PDF",
+    "fronta_hloubka": "PDF čekající ve frontě na worker",
+    "rozpracovano": "PDF ve frontě nebo právě zpracovávaná",
+    "slozka_cekajici": "PDF ležící ve sledované složce",
+}
+
+
+def inc(name, value=1, **labels):
+    key = (name, tuple(sorted(labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def record_document(stav, timer):
+    # Volá se jednou za každé PDF (spolu s timing.log_document)
+    inc("dokumenty_total", stav=stav, pojistovna=timer.info.get("pojistovna", "neznama"))
+    if timer.info.get("ocr_stranek"):
+        inc("ocr_stranky_total", timer.info["ocr_stranek"])
+    if stav == "chyba":
+        inc("chyby_total")
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(pairs):
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in pairs) + "}"
+
+
+def _header(lines, name, kind):
+    lines.append(f"# HELP {PREFIX}_{name} {HELP.get(name, name)}")
+    lines.append(f"# TYPE {PREFIX}_{name} {kind}")
+
+
+def render(gauges=None):
+    # gauges: {jméno: funkce bez argumentů} – hodnoty se zjistí až teď
+    # (jméno končící na _total je čítač, ostatní gauge)
+    lines = []
+    with _lock:
+        counters = dict(_counters)
+    by_name = {}
+    for (name, labels), value in sorted(counters.items()):
+        by_name.setdefault(name, []).append((labels, value))
+    for name, values in by_name.items():
+        _header(lines, name, "counter")
+        for labels, value in values:
+            lines.append(f"{PREFIX}_{name}{_labels(labels)} {value}")
+
+    histograms = timing.histograms()
+    if histograms:
+        _header(lines, "faze_sekundy", "histogram")
+        for stage, histogram in sorted(histograms.items()):
+            for bound, total in histogram.cumulative():
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{PREFIX}_faze_sekundy_bucket{_labels((('faze', stage), ('le', le)))} {total}")
+            lines.append(f"{PREFIX}_faze_sekundy_sum{_labels((('faze', stage),))} {histogram.sum}")
+            lines.append(f"{PREFIX}_faze_sekundy_count{_labels((('faze', stage),))} {histogram.count}")
+
+    for name, fn in (gauges or {}).items():
+        try:
+            value = fn()
+        except Exception:
+            continue
+        _header(lines, name, "counter" if name.endswith("_total") else "gauge")
+        lines.append(f"{PREFIX}_{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def start_server(host, port, gauges=None):
+    # HTTP server ve vlákně na pozadí; vrací server (server.shutdown() ho zastaví).
+    # Obsazený port metriky jen vypne (None) – watcher kvůli nim nespadne.
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render(gauges).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            # Bez výpisu každého dotazu do konzole
+            pass
+
+    try:
+        server = ThreadingHTTPServer((host, port), Handler)
+    except OSError as e:
+        print(f"⚠️ Metriky na {host}:{port} nejdou spustit ({e}) – pokračuji bez nich.")
+        return None
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, name="metrics", daemon=True).start()
+    print(f"📊 Metriky na http://{host}:{port}/metrics")
+    return server
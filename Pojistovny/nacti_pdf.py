@@ -6,12 +6,8 @@ pdf_path = "/Users/jirieifler/Desktop/POJISTOVNY/PDFka/petr šimon auto.pdf"
 # Otevři PDF
 doc = fitz.open(pdf_path)
 
-# Načti celý text
-full_text = ""
+# Výstup do konzole po stránkách (celý text se nedrží v paměti)
 for page in doc:
-    full_text += page.get_text()
+    print(page.get_text(), end="")
 
-doc.close()
-
-# Výstup do konzole
-print(full_text)
\ No newline at end of file
+doc.close()
\ No newline at end of file
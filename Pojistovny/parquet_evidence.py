@@ -0,0 +1,158 @@
+import os
+import re
+import csv
+import time
+import shutil
+import datetime
+import tempfile
+from evidence import klic_radku
+
+# Evidence v Parquetu pro analýzy (ceny podle pojišťoven, skladba krytí…).
+# Sloupce mají skutečné typy místo samých textů: částky a km jako int64, data jako date32,
+# pole ANO/NE a typy osob jako kategorie (dictionary). Řádky se zapisují po dávkách
+# jako nové soubory datasetu rozdělené podle roku počátku pojištění (rok=2024/…),
+# uvnitř po row groups – čtení pak načte jen potřebné sloupce a roky.
+# Zdrojem pravdy zůstává CSV/SQLite evidence, Parquet je výstup pro analýzy: vždy se
+# přegeneruje celý z evidence (export_parquet), připisování dílů by po opakovaném běhu
+# zdvojilo řádky.
+
+INT_COLUMNS = ("Cena", "Cena vozidla", "Najeté km")
+DATE_COLUMNS = ("Počátek pojištění", "Datum narození")
+CATEGORY_COLUMNS = (
+    "Havarijní pojištění", "Shodný provozovatel", "Shodný vlastník",
+    "Pojistník - Typ osoby", "Pojistník - Plátce DPH",
+    "Provozovatel - Typ osoby", "Provozovatel - Plátce DPH",
+    "Vlastník - Typ osoby", "Vlastník - Plátce DPH",
+    "Krytí PR",
+)
+PARTITION_COLUMN = "rok"
+ROW_GROUP_SIZE = 10000
+
+_DATUM = re.compile(r"(\d{1,2})\.\s*(\d{1,2})\.\s*(\d{4})")
+
+
+def to_int(value):
+    # "256 198", "350000", "neuvedeno" -> 256198, 350000, None
+    digits = re.sub(r"[\s ]", "", str(value or ""))
+    return int(digits) if digits.isdigit() else None
+
+
+def to_date(value):
+    match = _DATUM.search(str(value or ""))
+    if not match:
+        return None
+    try:
+        return datetime.date(int(match.group(3)), int(match.group(2)), int(match.group(1)))
+    except ValueError:
+        return None
+
+
+def to_table(rows, columns):
+    # Seznam řádků evidence (slovníky textů) -> pyarrow.Table s typy + sloupec rok pro rozdělení
+    import pyarrow as pa
+    arrays = []
+    fields = []
+    for col in columns:
+        values = [row.get(col) for row in rows]
+        if col in INT_COLUMNS:
+            array = pa.array([to_int(v) for v in values], type=pa.int64())
+        elif col in DATE_COLUMNS:
+            array = pa.array([to_date(v) for v in values], type=pa.date32())
+        elif col in CATEGORY_COLUMNS:
+            array = pa.array([v if v else None for v in values], type=pa.string()).dictionary_encode()
+        else:
+            array = pa.array([str(v) if v is not None else None for v in values], type=pa.string())
+        arrays.append(array)
+        fields.append(pa.field(col, array.type))
+    if "Počátek pojištění" in columns:
+        years = [date.year if date else None for date in (to_date(row.get("Počátek pojištění")) for row in rows)]
+    else:
+        years = [None] * len(rows)
+    arrays.append(pa.array(years, type=pa.int16()))
+    fields.append(pa.field(PARTITION_COLUMN, pa.int16()))
+    return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+class ParquetEvidenceSink:
+    # Stejné rozhraní jako ostatní sinky (append, append_many, close); řádky se drží
+    # v paměti a zapíšou se vždy po batch_size řádcích a při close().
+    def __init__(self, folder, columns, batch_size=ROW_GROUP_SIZE, row_group_size=ROW_GROUP_SIZE):
+        self.folder = folder
+        self.columns = list(columns)
+        self.batch_size = batch_size
+        self.row_group_size = row_group_size
+        self._rows = []
+        self._parts = 0
+
+    def append_many(self, rows):
+        self._rows.extend(rows)
+        if len(self._rows) >= self.batch_size:
+            self.flush()
+
+    def append(self, row):
+        self.append_many([row])
+
+    def pending(self):
+        return len(self._rows)
+
+    def flush(self):
+        if not self._rows:
+            return
+        import pyarrow.parquet as pq
+        os.makedirs(self.folder, exist_ok=True)
+        self._parts += 1
+        # Unikátní jméno dílu – víc procesů / běhů zapisuje do stejného datasetu
+        basename = f"part-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{self._parts}-{{i}}.parquet"
+        pq.write_to_dataset(
+            to_table(self._rows, self.columns),
+            root_path=self.folder,
+            partition_cols=[PARTITION_COLUMN],
+            basename_template=basename,
+            max_rows_per_group=self.row_group_size,
+        )
+        print(f"🧱 Parquet: zapsáno {len(self._rows)} řádků do {self.folder}.")
+        self._rows = []
+
+    def close(self):
+        self.flush()
+
+
+def read_csv_rows(csv_path, columns=None):
+    # S columns jen poslední verze každého řádku podle klic_radku – CSV evidence
+    # může mezi zhutněními obsahovat i starší verze přepsaných smluv
+    with open(csv_path, encoding="utf-8", newline="") as f:
+        if columns is None:
+            yield from csv.DictReader(f)
+            return
+        posledni = {}
+        for row in csv.DictReader(f):
+            posledni[klic_radku(row, columns)] = row
+    yield from posledni.values()
+
+
+def export_parquet(rows, columns, folder, batch_size=ROW_GROUP_SIZE):
+    # Celý dataset se zapíše do dočasné složky vedle cíle a pak se vymění za starý,
+    # ať čtenář nevidí mix starých a nových dílů. Starý dataset se nejdřív jen odsune
+    # stranou a smaže se, až když je nový na místě – při chybě se vrátí zpět.
+    parent = os.path.dirname(os.path.abspath(folder))
+    tmp_folder = tempfile.mkdtemp(prefix=".export_", dir=parent)
+    old_folder = None
+    try:
+        sink = ParquetEvidenceSink(tmp_folder, columns, batch_size=batch_size)
+        pocet = 0
+        for row in rows:
+            sink.append(row)
+            pocet += 1
+        sink.close()
+        if os.path.isdir(folder):
+            old_folder = tmp_folder + ".stary"
+            os.rename(folder, old_folder)
+        os.replace(tmp_folder, folder)
+    except Exception:
+        if old_folder is not None and os.path.isdir(old_folder) and not os.path.exists(folder):
+            os.rename(old_folder, folder)
+        shutil.rmtree(tmp_folder, ignore_errors=True)
+        raise
+    if old_folder is not None:
+        shutil.rmtree(old_folder, ignore_errors=True)
+    return pocet
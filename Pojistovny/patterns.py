@@ -0,0 +1,29 @@
+import re
+
+# Předkompilované regexy sdílené extraktory pojišťoven.
+# Vzory konkrétní pojišťovny jsou v jejím modulu (insurers/<pojišťovna>.py, slovník PATTERNS)
+# a kompilují se jednou při jeho importu; extraktory je jen používají,
+# takže nezáleží na velikosti cache modulu re a vzory jdou vypsat / změřit.
+
+EMAIL = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")
+RC_PREFIX = re.compile(r"\d{6}")
+
+
+def label_value(label):
+    # "Štítek: hodnota" v rámci jednoho bloku (Generali)
+    return re.compile(rf"{re.escape(label)}\s*:\s*(.+)")
+
+
+def label_block(label):
+    # "Štítek hodnota" do konce řádku (Kooperativa)
+    return re.compile(rf"{label}\s+([^\n]*)")
+
+
+def iter_patterns():
+    # (pojišťovna, pole, vzor) – pro výpis a měření vzorů; vzory jednotlivých
+    # pojišťoven jsou v jejich modulech (insurers/), tady se načtou všechny
+    import insurers
+    for insurer in insurers.names():
+        for field, value in insurers.get(insurer).PATTERNS.items():
+            for pattern in value if isinstance(value, list) else [value]:
+                yield insurer, field, pattern
@@ -0,0 +1,155 @@
+import os
+import sys
+import csv
+import time
+import argparse
+import classifier
+import insurers
+import sections
+from patterns import iter_patterns
+
+# Profilování pravidel a regexů po polích na skutečných dokumentech.
+# Pro každý dokument se změří každé pravidlo FieldEngine pojišťovny (i náhradní varianty,
+# které by se při běžné extrakci nezkoušely) a každý vzor z PATTERNS hledaný v celém textu
+# (tak, jak je hledají starší skripty). Pravidla nad rozpočtem se vypíšou hned,
+# na konci vznikne seznam seřazený podle nejhoršího času.
+#
+#   python profiling.py /Users/jirieifler/POJISTOVNY/ZPRACOVANE --report profil.csv
+#   python profiling.py /Users/jirieifler/POJISTOVNY/CACHE/text     # texty z cache (.txt)
+#   python profiling.py slozka --vsechny-vzory   # i vzory ostatních pojišťoven (chybějící kotvy)
+
+# Rozpočet na jedno pravidlo / vzor v jednom dokumentu
+BUDGET_MS = 20.0
+
+# Hledání, která žijí jen v samostatných skriptech (Kooperativa1.py, skripty v AI/), ne v insurers/
+STANDALONE = [
+    ("koop", "Krytí PR (Kooperativa1.py, AI/)", sections.koop_kryti),
+]
+
+
+def najdi_dokumenty(folder):
+    paths = []
+    for root, _, files in os.walk(folder):
+        for name in files:
+            if name.lower().endswith((".pdf", ".txt")):
+                paths.append(os.path.join(root, name))
+    return sorted(paths)
+
+
+def nacti_text(path):
+    if path.lower().endswith(".txt"):
+        with open(path, encoding="utf-8") as f:
+            return f.read()
+    from extractors import pdf_text
+    return pdf_text(path)
+
+
+class Stat:
+    __slots__ = ("count", "total", "max", "max_file", "over")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.max_file = ""
+        self.over = 0
+
+    def add(self, seconds, filename, budget):
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+            self.max_file = filename
+        if seconds > budget:
+            self.over += 1
+
+
+def _measure(stats, key, fn, filename, budget):
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+    stats.setdefault(key, Stat()).add(seconds, filename, budget)
+    if seconds > budget:
+        print(f"🐢 {filename}: {key[0]} {key[1]} {key[2]} – {seconds * 1000:.1f} ms")
+
+
+def profile_text(stats, text, filename, budget=BUDGET_MS / 1000, all_patterns=False):
+    # Přičte časy pravidel a vzorů jednoho dokumentu do stats {(pojišťovna, druh, název): Stat}
+    insurer, _ = classifier.classify_text(text)
+    if insurer is None:
+        return None
+    engine = insurers.get(insurer).ENGINE
+    doc = engine.scan(text)
+
+    def build_index():
+        # Index kotev se staví líně – předem, ať ho nezaplatí první pravidlo s danou kotvou
+        for anchor in engine.anchors:
+            doc.positions(anchor)
+        return doc.lines
+
+    _measure(stats, (insurer, "index", "LineIndex"), build_index, filename, budget)
+    for rule in engine.rules:
+        _measure(stats, (insurer, "pravidlo", repr(rule)), lambda: rule.resolve(doc), filename, budget)
+    for owner, field, pattern in iter_patterns():
+        if owner == insurer or all_patterns:
+            _measure(stats, (owner, "vzor", f"{field}: {pattern.pattern}"), lambda: pattern.search(text),
+                     filename, budget)
+    for owner, name, fn in STANDALONE:
+        if owner == insurer or all_patterns:
+            _measure(stats, (owner, "skript", name), lambda: fn(text), filename, budget)
+    return insurer
+
+
+def ranked(stats):
+    return sorted(stats.items(), key=lambda item: (item[1].max, item[1].total), reverse=True)
+
+
+def write_report(stats, path):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["pojišťovna", "druh", "pravidlo", "dokumentů", "celkem ms", "průměr ms",
+                         "max ms", "nad rozpočtem", "nejpomalejší dokument"])
+        for (insurer, kind, name), stat in ranked(stats):
+            writer.writerow([insurer, kind, name, stat.count, f"{stat.total * 1000:.3f}",
+                             f"{stat.total / stat.count * 1000:.3f}", f"{stat.max * 1000:.3f}",
+                             stat.over, stat.max_file])
+
+
+def print_report(stats, top=20):
+    print(f"{'max ms':>9} {'průměr ms':>10} {'nad':>5}  pravidlo")
+    for (insurer, kind, name), stat in ranked(stats)[:top]:
+        print(f"{stat.max * 1000:>9.2f} {stat.total / stat.count * 1000:>10.3f} {stat.over:>5}  "
+              f"{insurer} {kind} {name[:90]}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Profilování pravidel a regexů po polích.")
+    parser.add_argument("folder", help="složka s PDF nebo .txt texty")
+    parser.add_argument("--rozpocet-ms", type=float, default=BUDGET_MS)
+    parser.add_argument("--vsechny-vzory", action="store_true", help="zkoušet i vzory ostatních pojišťoven")
+    parser.add_argument("--report", default=None, help="CSV se seřazeným výsledkem")
+    parser.add_argument("--top", type=int, default=20)
+    args = parser.parse_args(argv)
+
+    stats = {}
+    paths = najdi_dokumenty(args.folder)
+    print(f"📂 {len(paths)} dokumentů, rozpočet {args.rozpocet_ms:.0f} ms na pravidlo...")
+    for path in paths:
+        filename = os.path.basename(path)
+        try:
+            text = nacti_text(path)
+        except Exception as e:
+            print(f"❌ {filename}: {e}")
+            continue
+        if profile_text(stats, text, filename, args.rozpocet_ms / 1000, args.vsechny_vzory) is None:
+            print(f"⚠️ {filename}: pojišťovna nerozpoznána – přeskočeno.")
+
+    print_report(stats, args.top)
+    if args.report:
+        write_report(stats, args.report)
+        print(f"💾 Report uložen do {args.report}.")
+    return 1 if any(stat.over for stat in stats.values()) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,37 @@
+import re
+import time
+
+# Hledání ve vymezeném úseku textu místo vzoru s .*? přes celý dokument (DOTALL).
+# Úsek začíná kotvou (např. "Limit") a má nejvýš window znaků; vzor se zkouší jen v něm.
+# Jeden pokus tak stojí nejvýš úměrně window bez ohledu na délku dokumentu a celé hledání
+# je lineární v délce textu. Když kotva v textu chybí, nehledá se vůbec.
+# Mezi pokusy se hlídá časový rozpočet pole – po jeho vyčerpání se pole vzdá (bez hodnoty).
+
+SECTION_WINDOW = 800
+FIELD_BUDGET = 0.05
+
+# Krytí PR u Kooperativy, hledané v úseku za "Limit": "na zdraví 100 mil. Kč … na škodě 100 mil. Kč"
+KOOP_KRYTI = re.compile(r"na zdraví.*?(\d+\s*mil\.\s*Kč).*?škodě.*?(\d+\s*mil\.\s*Kč)", re.DOTALL)
+
+
+def search_section(pattern, text, anchor, window=SECTION_WINDOW, budget=FIELD_BUDGET):
+    # První shoda vzoru v úseku za některým výskytem kotvy, nebo None
+    deadline = time.perf_counter() + budget
+    pos = text.find(anchor)
+    while pos != -1:
+        match = pattern.search(text, pos, pos + window)
+        if match:
+            return match
+        if time.perf_counter() > deadline:
+            print(f"⏱️ Hledání za '{anchor}' přerušeno po {budget * 1000:.0f} ms.")
+            return None
+        pos = text.find(anchor, pos + 1)
+    return None
+
+
+def koop_kryti(text):
+    # "100mil.Kč/100mil.Kč", nebo "" – stejný formát jako dřív z celého textu
+    match = search_section(KOOP_KRYTI, text, "Limit")
+    if not match:
+        return ""
+    return f"{match[1].replace(' ', '')}/{match[2].replace(' ', '')}"
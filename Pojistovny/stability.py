@@ -0,0 +1,122 @@
+import os
+import time
+
+# Čekání, než je soubor dopsaný (kopírování přes SMB/OneDrive, stahování z prohlížeče).
+# on_created přijde hned, jak se soubor objeví, ne až když je celý zapsaný.
+# Soubor je připravený, když se mu během STABLE_CHECKS po sobě jdoucích kontrol
+# (po STABLE_INTERVAL s) nezmění velikost ani čas změny a jde otevřít pro čtení.
+
+STABLE_INTERVAL = 1.0
+STABLE_CHECKS = 2
+# Déle než STABLE_TIMEOUT s se na soubor nečeká (zůstane ve složce)
+STABLE_TIMEOUT = 600
+# Opakování zpracování při přechodné chybě: čeká se RETRY_BACKOFF, 2× RETRY_BACKOFF, … s
+RETRY_ATTEMPTS = 3
+RETRY_BACKOFF = 2.0
+
+
+def _signature(path):
+    stat = os.stat(path)
+    return stat.st_size, stat.st_mtime_ns
+
+
+def signature(path):
+    # (velikost, čas změny), nebo None, když soubor zmizel
+    try:
+        return _signature(path)
+    except FileNotFoundError:
+        return None
+
+
+def _can_open(path):
+    # Na Windows nejde otevřít soubor, do kterého ještě jiný proces zapisuje
+    try:
+        with open(path, "rb"):
+            return True
+    except OSError:
+        return False
+
+
+def is_stable(path, window=STABLE_INTERVAL * STABLE_CHECKS):
+    # Jedna kontrola bez čekání: soubor se aspoň window s nezměnil a jde otevřít.
+    # Bere se i ctime – kopie se zachovaným časem změny (Finder, cp -p) ji má čerstvou
+    # (na Windows je to čas vytvoření). None = soubor zmizel.
+    try:
+        stat = os.stat(path)
+    except FileNotFoundError:
+        return None
+    if stat.st_size == 0 or time.time() - max(stat.st_mtime, stat.st_ctime) < window:
+        return False
+    return _can_open(path)
+
+
+def wait_until_stable(path, interval=STABLE_INTERVAL, checks=STABLE_CHECKS, timeout=STABLE_TIMEOUT):
+    # True = soubor je dopsaný, False = zmizel nebo se do timeoutu neustálil.
+    # Starý soubor (např. při dohánění složky) projde hned bez čekání.
+    if is_stable(path, interval * checks):
+        return True
+    deadline = time.monotonic() + timeout
+    last = None
+    stable = 0
+    while True:
+        try:
+            current = _signature(path)
+        except FileNotFoundError:
+            return False
+        if current == last and current[0] > 0:
+            stable += 1
+            if stable >= checks and _can_open(path):
+                return True
+        else:
+            stable = 0
+        last = current
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+
+
+def is_transient(error, path, before):
+    # Chyba, kterou může spravit nový pokus: soubor je zamčený nebo nedostupný (OSError),
+    # nebo se během zpracování přepsal (before = signature(path) před pokusem).
+    # Poškozené PDF (chyby fitz při otevření a čtení) se opakováním nespraví.
+    if not os.path.exists(path):
+        return False
+    return isinstance(error, OSError) or signature(path) != before
+
+
+class Retries:
+    # Počet pokusů pro každý soubor. Místo čekání vrátí, za kolik sekund to zkusit znovu
+    # (workers.WorkQueue soubor zařadí znovu), nebo None – vzdát a chybu předat dál.
+    def __init__(self, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF):
+        self.attempts = attempts
+        self.backoff = backoff
+        self._counts = {}
+
+    def delay(self, path, error, before):
+        attempt = self._counts.pop(path, 0)
+        if attempt + 1 >= self.attempts or not is_transient(error, path, before):
+            return None
+        self._counts[path] = attempt + 1
+        delay = self.backoff * 2 ** attempt
+        print(f"⏳ {os.path.basename(path)}: {error} – nový pokus za {delay:.0f} s")
+        return delay
+
+    def done(self, path):
+        self._counts.pop(path, None)
+
+
+def with_retry(fn, path, attempts=RETRY_ATTEMPTS, backoff=RETRY_BACKOFF):
+    # fn(path) s opakováním pro vlákno, které smí čekat: po přechodné chybě se počká,
+    # znovu se ověří, že je soubor dopsaný, a zkusí se to znovu. Ostatní chyby
+    # a poslední neúspěšný pokus se předají volajícímu.
+    retries = Retries(attempts, backoff)
+    while True:
+        before = signature(path)
+        try:
+            return fn(path)
+        except Exception as e:
+            delay = retries.delay(path, e, before)
+            if delay is None:
+                raise
+            time.sleep(delay)
+            wait_until_stable(path)
@@ -0,0 +1,132 @@
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Měření fází zpracování jednoho PDF (otevření, text, rozpoznání pojišťovny, extrakce po polích,
+# zápis do evidence, přesun souboru). Každý dokument skončí jedním JSON řádkem v logu
+# a jeho časy se přičtou do kumulativních histogramů (po fázích, za celý běh procesu).
+#
+#   {"cas": "2025-01-31T10:15:02", "soubor": "smlouva.pdf", "stav": "ok", "pojistovna": "koop",
+#    "faze": {"otevreni": 0.004, "text": 0.051, "detekce": 0.001, ...}, "pole": {"Cena": 0.0002, ...}}
+
+# Horní hranice košů histogramu v sekundách (poslední koš je +Inf)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+class StageTimer:
+    # Časy jednoho dokumentu; stejná fáze změřená víckrát se sčítá.
+    # info = další údaje do logu (např. pojišťovna)
+    def __init__(self):
+        self.stages = {}
+        self.fields = {}
+        self.info = {}
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, time.perf_counter() - start)
+
+    def merge(self, other):
+        # Časy změřené jinde (např. ve worker procesu)
+        for stage, seconds in other.stages.items():
+            self.add(stage, seconds)
+        for field, seconds in other.fields.items():
+            self.fields[field] = self.fields.get(field, 0.0) + seconds
+        self.info.update(other.info)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(self.buckets):
+            if seconds <= bound:
+                break
+        else:
+            i = len(self.buckets)
+        self.counts[i] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def cumulative(self):
+        # [(horní hranice, počet hodnot <= hranice)], poslední hranice je inf
+        result = []
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            result.append((bound, total))
+        return result
+
+    def quantile(self, q):
+        # Odhad kvantilu = horní hranice koše, ve kterém leží
+        if not self.count:
+            return 0.0
+        for bound, total in self.cumulative():
+            if total >= q * self.count:
+                return bound
+        return float("inf")
+
+
+_lock = threading.Lock()
+_histograms = {}
+
+
+def observe(stage, seconds):
+    with _lock:
+        if stage not in _histograms:
+            _histograms[stage] = Histogram()
+        _histograms[stage].observe(seconds)
+
+
+def histograms():
+    # Kopie histogramů {fáze: Histogram} pro výpis nebo export metrik
+    with _lock:
+        snapshot = {}
+        for stage, histogram in _histograms.items():
+            copy = Histogram(histogram.buckets)
+            copy.counts = list(histogram.counts)
+            copy.sum = histogram.sum
+            copy.count = histogram.count
+            snapshot[stage] = copy
+        return snapshot
+
+
+def log_document(log_path, filename, stav, timer, **extra):
+    # JSON řádek do logu (log_path=None = jen histogramy) + přičtení do histogramů
+    for stage, seconds in timer.stages.items():
+        observe(stage, seconds)
+    observe("celkem", sum(timer.stages.values()))
+    if not log_path:
+        return
+    record = {"cas": time.strftime("%Y-%m-%dT%H:%M:%S"), "soubor": filename, "stav": stav}
+    record.update(timer.info)
+    record.update(extra)
+    record["faze"] = {stage: round(seconds, 6) for stage, seconds in timer.stages.items()}
+    if timer.fields:
+        record["pole"] = {field: round(seconds, 6) for field, seconds in timer.fields.items()}
+    line = json.dumps(record, ensure_ascii=False) + "\n"
+    with _lock:
+        with open(log_path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+
+def print_histograms():
+    snapshot = histograms()
+    if not snapshot:
+        return
+    print(f"⏱️ {'fáze':<14} {'počet':>7} {'průměr ms':>10} {'p50 ≤ ms':>9} {'p95 ≤ ms':>9}")
+    for stage, histogram in sorted(snapshot.items(), key=lambda item: -item[1].sum):
+        prumer = histogram.sum / histogram.count * 1000
+        print(f"   {stage:<14} {histogram.count:>7} {prumer:>10.1f} "
+              f"{histogram.quantile(0.5) * 1000:>9.0f} {histogram.quantile(0.95) * 1000:>9.0f}")
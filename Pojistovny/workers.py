@@ -0,0 +1,128 @@
+import os
+import queue
+import threading
+
+# Omezená fronta mezi watchdogem a extrakcí.
+# Observer jen vloží cestu do fronty (okamžitě se vrací) a soubory zpracovává
+# pool worker vláken. Když je fronta plná, rozhoduje policy:
+#   "block" – observer počká, než se ve frontě uvolní místo (nejvýš block_timeout s)
+#   "drop"  – soubor se nezařadí a zůstane ve sledované složce; zařadí ho až pravidelný
+#             průchod složkou ve watcheru (config.RECONCILE_INTERVAL)
+# worker_fn může vrátit počet sekund – soubor ještě není připravený (dopisuje se)
+# a zařadí se znovu po této době, aniž by worker mezitím čekal.
+
+POLICIES = ("block", "drop")
+
+
+class WorkQueue:
+    def __init__(self, worker_fn, workers=2, maxsize=100, policy="block", block_timeout=30):
+        if policy not in POLICIES:
+            raise ValueError(f"Neznámá policy fronty: {policy}")
+        self.worker_fn = worker_fn
+        self.workers = workers
+        self.policy = policy
+        self.block_timeout = block_timeout
+        self.queue = queue.Queue(maxsize=maxsize)
+        self._threads = []
+        self._pending = set()
+        self._pending_lock = threading.Lock()
+        self._timers = set()
+        # Počet souborů, které se nevešly do plné fronty (pro metriky)
+        self.dropped = 0
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._run, name=f"pdf-worker-{i + 1}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, path):
+        # Stejný soubor nezařadíme dvakrát, dokud se zpracovává
+        with self._pending_lock:
+            if path in self._pending:
+                return False
+            self._pending.add(path)
+
+        return self._put(path)
+
+    def _put(self, path):
+        try:
+            if self.policy == "block":
+                self.queue.put(path, timeout=self.block_timeout)
+            else:
+                self.queue.put_nowait(path)
+        except queue.Full:
+            with self._pending_lock:
+                self._pending.discard(path)
+                self.dropped += 1
+            print(f"⚠️ Fronta je plná ({self.queue.maxsize}), {path} zůstává ve složce.")
+            return False
+        return True
+
+    def _later(self, path, delay):
+        # Soubor zůstává mezi rozpracovanými (další události ho nezařadí podruhé)
+        def fire():
+            with self._pending_lock:
+                self._timers.discard(timer)
+            self._put(path)
+
+        timer = threading.Timer(delay, fire)
+        timer.daemon = True
+        with self._pending_lock:
+            self._timers.add(timer)
+        timer.start()
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def in_progress(self):
+        # Ve frontě + právě zpracovávané
+        with self._pending_lock:
+            return len(self._pending)
+
+    def _run(self):
+        while True:
+            path = self.queue.get()
+            if path is None:
+                self.queue.task_done()
+                return
+            delay = None
+            try:
+                delay = self.worker_fn(path)
+            except Exception as e:
+                print(f"❌ Neošetřená chyba workeru u {path}: {e}")
+            finally:
+                if delay:
+                    self._later(path, delay)
+                else:
+                    with self._pending_lock:
+                        self._pending.discard(path)
+                self.queue.task_done()
+
+    def stop(self, wait=True):
+        # Dokončí, co je ve frontě, a ukončí workery (soubory čekající na dopsání zůstanou ve složce)
+        with self._pending_lock:
+            timers, self._timers = self._timers, set()
+        for timer in timers:
+            timer.cancel()
+        for _ in self._threads:
+            self.queue.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+        self._threads = []
+
+
+def pending_pdfs(folder):
+    # PDF, která už ve složce leží (nejstarší první) – os.scandir vrací typ i stat bez dalších volání.
+    # Soubor, který mezitím worker přesunul (zpracovaný, do CHYBY), se vynechá.
+    found = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if not entry.is_file() or not entry.name.lower().endswith(".pdf"):
+                continue
+            try:
+                found.append((entry.stat().st_mtime, entry.path))
+            except FileNotFoundError:
+                continue
+    return [path for _, path in sorted(found)]